@@ -4,6 +4,8 @@ import gzip
 import shutil
 import logging
 import csv
+from core.scrapers.warc_writer import list_warc_files
+from core.scrapers.pdf_store import PdfStore
 
 
 class FileCompressor:
@@ -38,8 +40,11 @@ class FileCompressor:
     def compress_pdfs(self):
         """
         Compress all PDFs in <project>/<subproject>/pdfs/scraped-pdfs/ into a ZIP file.
+
+        The documents are taken from the store's manifest, so each one is
+        archived once; the manifest itself is added to the archive as well.
         """
-        pdf_dir = os.path.join(self.project_folder, "pdfs", "scraped-pdfs")
+        store = PdfStore(os.path.join(self.project_folder, "pdfs", "scraped-pdfs"))
         zip_file_name = f"{self.project_name}_{self.subproject_name}.zip"
         zip_path = os.path.join(self.compressed_folder, zip_file_name)
 
@@ -48,14 +53,16 @@ class FileCompressor:
 
         try:
             with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for pdf_file in os.listdir(pdf_dir):
-                    if pdf_file.endswith(".pdf"):
-                        pdf_path = os.path.join(pdf_dir, pdf_file)
-                        file_size = os.path.getsize(pdf_path)
-                        zipf.write(pdf_path, arcname=pdf_file)
-                        file_sizes.append((pdf_file, file_size))
-                        total_bytes += file_size
-                        self._log(f"Added {pdf_file} ({file_size} bytes) to ZIP archive.")
+                for document in store.documents():
+                    pdf_path = store.path_for(document["sha256"])
+                    pdf_file = os.path.basename(pdf_path)
+                    file_size = os.path.getsize(pdf_path)
+                    zipf.write(pdf_path, arcname=pdf_file)
+                    file_sizes.append((pdf_file, file_size))
+                    total_bytes += file_size
+                    self._log(f"Added {pdf_file} ({file_size} bytes) to ZIP archive.")
+                if os.path.exists(store.manifest_path):
+                    zipf.write(store.manifest_path, arcname="manifest.csv")
 
             file_sizes.append(("TOTAL", total_bytes))
             self._write_bytes_to_csv(file_sizes)
@@ -69,6 +76,9 @@ class FileCompressor:
     def compress_warcs(self):
         """
         Compress all WARCs in <project>/<subproject>/warcs/scraped-warcs/ into a .warc.gz file.
+
+        Finished segments are streamed in serial order; a segment still being
+        written (`.warc.open`) is left out.
         """
         warc_dir = os.path.join(self.project_folder, "warcs", "scraped-warcs")
         gz_file_name = f"{self.project_name}_{self.subproject_name}.warc.gz"
@@ -79,15 +89,14 @@ class FileCompressor:
 
         try:
             with gzip.open(gz_path, 'wb') as gz_file:
-                for warc_file in os.listdir(warc_dir):
-                    if warc_file.endswith(".warc"):
-                        warc_path = os.path.join(warc_dir, warc_file)
-                        file_size = os.path.getsize(warc_path)
-                        with open(warc_path, 'rb') as warc:
-                            shutil.copyfileobj(warc, gz_file)
-                        file_sizes.append((warc_file, file_size))
-                        total_bytes += file_size
-                        self._log(f"Added {warc_file} ({file_size} bytes) to WARC.GZ archive.")
+                for warc_file in list_warc_files(warc_dir):
+                    warc_path = os.path.join(warc_dir, warc_file)
+                    file_size = os.path.getsize(warc_path)
+                    with open(warc_path, 'rb') as warc:
+                        shutil.copyfileobj(warc, gz_file, 1024 * 1024)
+                    file_sizes.append((warc_file, file_size))
+                    total_bytes += file_size
+                    self._log(f"Added {warc_file} ({file_size} bytes) to WARC.GZ archive.")
 
             file_sizes.append(("TOTAL", total_bytes))
             self._write_bytes_to_csv(file_sizes)
@@ -0,0 +1,213 @@
+import os
+import atexit
+import logging
+import threading
+from urllib.parse import urlsplit
+from selenium import webdriver
+
+
+class PooledDriver:
+    def __init__(self, driver):
+        """
+        Wrap a pooled Chrome WebDriver, counting the pages it loads.
+
+        Every attribute of the underlying driver is available on the wrapper,
+        so it can be used (and passed to `WebDriverWait`) like a plain driver.
+        """
+        self.driver = driver
+        self.pages = 0
+        self.origins = set()
+
+    def get(self, url):
+        self.pages += 1
+        parts = urlsplit(url)
+        if parts.scheme in ("http", "https"):
+            self.origins.add(f"{parts.scheme}://{parts.netloc}")
+        return self.driver.get(url)
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+
+class BrowserPool:
+    def __init__(self, size=2, max_pages_per_browser=200, headless=True):
+        """
+        Initialize a pool of up to `size` warm Chrome instances.
+
+        Callers lease a browser with `acquire` and hand it back with `release`
+        (or use `lease` as a context manager) instead of launching their own.
+        Each lease starts in a fresh tab with its own download folder, and on
+        release the cookies and site storage the lease created are wiped, so
+        leases do not see each other's sessions. A browser is restarted after
+        `max_pages_per_browser` page loads to keep memory growth in check.
+        """
+        self.size = size
+        self.max_pages_per_browser = max_pages_per_browser
+        self.headless = headless
+        self._idle = []
+        self._leased = 0
+        self._condition = threading.Condition()
+
+    def _launch(self):
+        options = webdriver.ChromeOptions()
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        if self.headless:
+            options.add_argument("--headless=new")
+        prefs = {
+            "download.prompt_for_download": False,
+            "download.directory_upgrade": True,
+            "plugins.always_open_pdf_externally": True,
+            "profile.default_content_setting_values.automatic_downloads": 1,
+        }
+        options.add_experimental_option("prefs", prefs)
+        logging.info("Launching a Chrome instance for the browser pool.")
+        return PooledDriver(webdriver.Chrome(options=options))
+
+    def resize(self, size):
+        """
+        Allow up to `size` browsers; extra idle browsers are shut down.
+        """
+        with self._condition:
+            self.size = size
+            while self._idle and len(self._idle) + self._leased > self.size:
+                self._quit(self._idle.pop())
+            self._condition.notify_all()
+
+    def warm(self, count=None):
+        """
+        Start browsers ahead of time so the first leases do not pay for the launch.
+        """
+        with self._condition:
+            missing = min(count or self.size, self.size) - len(self._idle) - self._leased
+        for _ in range(max(0, missing)):
+            driver = self._launch()
+            with self._condition:
+                self._idle.append(driver)
+                self._condition.notify()
+
+    def acquire(self, download_dir=None, timeout=None):
+        """
+        Lease a browser, launching one if the pool is not full, and waiting otherwise.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._idle or self._leased < self.size, timeout):
+                raise TimeoutError("No browser became available in the pool.")
+            self._leased += 1
+            driver = self._idle.pop() if self._idle else None
+
+        try:
+            if driver is None:
+                driver = self._launch()
+            self._prepare(driver, download_dir)
+        except Exception:
+            if driver is not None:
+                self._quit(driver)
+            with self._condition:
+                self._leased -= 1
+                self._condition.notify()
+            raise
+        return driver
+
+    def _prepare(self, driver, download_dir):
+        """
+        Give a leased browser a fresh tab and point its downloads at `download_dir`.
+        """
+        old_handles = driver.window_handles
+        driver.switch_to.new_window("tab")
+        for handle in old_handles:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(driver.window_handles[0])
+        if download_dir:
+            download_dir = os.path.abspath(download_dir)
+            os.makedirs(download_dir, exist_ok=True)
+            driver.execute_cdp_cmd("Browser.setDownloadBehavior", {
+                "behavior": "allow",
+                "downloadPath": download_dir,
+            })
+
+    def release(self, driver):
+        """
+        Return a leased browser, wiping what the lease left behind or recycling the browser.
+        """
+        recycle = driver.pages >= self.max_pages_per_browser
+        if not recycle:
+            try:
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+                for origin in driver.origins:
+                    driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+                driver.origins.clear()
+                driver.execute_cdp_cmd("Browser.setDownloadBehavior", {"behavior": "default"})
+            except Exception as e:
+                logging.warning(f"Could not reset pooled browser, recycling it: {e}")
+                recycle = True
+
+        with self._condition:
+            self._leased -= 1
+            keep = not recycle and len(self._idle) + self._leased < self.size
+            if keep:
+                self._idle.append(driver)
+            self._condition.notify()
+        if not keep:
+            if recycle:
+                logging.info(f"Recycling a pooled browser after {driver.pages} pages.")
+            self._quit(driver)
+
+    def lease(self, download_dir=None, timeout=None):
+        """
+        Context manager around `acquire` and `release`.
+        """
+        return _Lease(self, download_dir, timeout)
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.warning(f"Failed to shut down a pooled browser: {e}")
+
+    def shutdown(self):
+        """
+        Quit all idle browsers.
+        """
+        with self._condition:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._quit(driver)
+
+
+class _Lease:
+    def __init__(self, pool, download_dir, timeout):
+        self.pool = pool
+        self.download_dir = download_dir
+        self.timeout = timeout
+        self.driver = None
+
+    def __enter__(self):
+        self.driver = self.pool.acquire(self.download_dir, self.timeout)
+        return self.driver
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.pool.release(self.driver)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool(size=None):
+    """
+    Return the process-wide browser pool, creating it on first use.
+
+    The pool outlives individual scraping runs (and Streamlit reruns), which is
+    what keeps its browsers warm. Passing `size` grows or shrinks it.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(size=size or 2)
+            atexit.register(_pool.shutdown)
+        elif size is not None and size != _pool.size:
+            _pool.resize(size)
+        return _pool
@@ -1,20 +1,36 @@
 from crawl4ai.async_webcrawler import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode, MemoryAdaptiveDispatcher, CrawlerMonitor, DisplayMode, RateLimiter
 import asyncio
 import logging
+from urllib.parse import urlsplit, urlunsplit
+from core.scrapers.static_links import extract_links
+
+
+def normalise_url(url):
+    """
+    Reduce a URL to a form that ignores case in the scheme and host, default ports, fragments and a trailing slash.
+    """
+    parts = urlsplit(url)
+    netloc = parts.netloc.lower()
+    for default_port in (":80", ":443"):
+        if netloc.endswith(default_port):
+            netloc = netloc[:-len(default_port)]
+    return urlunsplit((parts.scheme.lower(), netloc, parts.path.rstrip("/") or "/", parts.query, ""))
+
 
 class Crawl4aiCrawler:
-    def __init__(self,max_retries,max_session,memory_threshold):
+    def __init__(self,max_retries,max_session,memory_threshold,stream=True):
         self.max_retries=max_retries
         self.max_session=max_session
         self.memory_threshold=memory_threshold
+        self.stream=stream
         self.browser_config, self.dispatcher = self._create_config()
         logging.info("Crawler initialized with configurations.")
  
-    def _create_run_config(self,css_selector) :
+    def _create_run_config(self) :
+        # No css_selector here: one run serves several sites, so selectors are applied per page afterwards
         run_config = CrawlerRunConfig(
             cache_mode=CacheMode.BYPASS,
-            stream=False,
-            css_selector=css_selector)
+            stream=self.stream)
         return run_config
     def _create_browser_config(self) :
         browser_config = BrowserConfig(
@@ -45,62 +61,74 @@ class Crawl4aiCrawler:
         return browser_config,dispatcher
 
 
-    async def crawl_batch(self,urls,css_selector):
+    def _process_result(self,result,selectors,on_links):
+        """
+        Hand a result's links to `on_links` and return the requested page URL with its link count, or None.
+        """
+        url = self._requested_url(result.url, selectors)
+        if url is None:
+            print(f"Crawled {result.url}, which matches none of the requested pages; skipping it")
+            return result.url, None
+        if not result.success:
+            print(f"Failed to crawl {url}: {result.error_message}")
+            return url, None
+        try:
+            links = extract_links(result.html, result.url, selectors[url])
+        except Exception as e:
+            # One unparsable page must not end the whole batch
+            print(f"Failed to extract links from {url}: {e}")
+            return url, None
+        on_links(url, links)
+        return url, len(links)
 
+    @staticmethod
+    def _requested_url(url, selectors):
+        """
+        Map a result URL back to the page that was requested, as crawl4ai may report it normalised.
+        """
+        if url in selectors:
+            return url
+        normalised = normalise_url(url)
+        for requested in selectors:
+            if normalise_url(requested) == normalised:
+                return requested
+        return None
 
-        
-    #     run_config = CrawlerRunConfig(
-    #         cache_mode=CacheMode.BYPASS,
-    #         stream=False,
-    #         css_selector=css_selector # CSS selector bisa diganti
-    #     )
-        
-    
-
-    
+    def open_browser(self):
+        """
+        Return a browser, as an async context manager, that several `crawl_batch` calls can share.
+        """
+        return AsyncWebCrawler(config=self.browser_config)
 
+    async def crawl_batch(self,pages,on_links,crawler=None):
+        """
+        Crawl `(url, css_selector)` pages of any number of sites in one batch, passing each page's links to `on_links`.
 
+        Pass a browser from `open_browser` as `crawler` to reuse it. Returns the link count per page, None if it failed.
+        """
+        if crawler is None:
+            async with self.open_browser() as crawler:
+                return await self.crawl_batch(pages, on_links, crawler)
 
-    # dispatcher = MemoryAdaptiveDispatcher( 
-    #     memory_threshold_percent=80.0, # threshold bisa diubah
-    #     check_interval=1.0,
-    #     max_session_permit=50, # bisa diganti
-    #     monitor=CrawlerMonitor(
-    #         display_mode=DisplayMode.DETAILED
-    #     ),
-    #     # rate_limiter=RateLimiter(      
-    #     #     base_delay=(1.0, 2.0),
-    #     #     max_delay=30.0,
-    #     #     max_retries=2 # bisa diubah
-    #     # ),
-    # )
-
-        async with AsyncWebCrawler(config=self.browser_config) as crawler:
-
-            results = await crawler.arun_many(
-                urls=urls,
-                config=self._create_run_config(css_selector),
-                dispatcher=self.dispatcher
-            )
-
-            # for result in results:
-            #     if result.success:
-            #         print(result.cleaned_html[:500]) 
-            #         print("=============================================")
-            #     else:
-            #         print(f"Failed to crawl {result.url}: {result.error_message}")
-
-            
+        selectors = dict(pages)
+        link_counts = {}
+        results = await crawler.arun_many(
+            urls=list(selectors),
+            config=self._create_run_config(),
+            dispatcher=self.dispatcher
+        )
 
-            all_links = []
+        if self.stream:
+            async for result in results:
+                url, count = self._process_result(result, selectors, on_links)
+                link_counts[url] = count
+        else:
             for result in results:
-                if result.success:
-                    all_links.extend([ele["href"] for ele in result.links["internal"]])
-                else:
-                    print(f"Failed to crawl {result.url}: {result.error_message}")
-            return all_links
-    def run_scrap(self,urls,css_selector) :
-        return asyncio.run(self.crawl_batch(urls,css_selector))
+                url, count = self._process_result(result, selectors, on_links)
+                link_counts[url] = count
+        return link_counts
+    def run_scrap(self,pages,on_links) :
+        return asyncio.run(self.crawl_batch(pages,on_links))
     
 # if __name__ == "__main__":
 #     css_selector = "h3.gdlr-core-blog-title.gdlr-core-skin-title a"
@@ -0,0 +1,111 @@
+from core.scrapers.sqlite_store import SqliteStore
+
+
+class CrawlJournal(SqliteStore):
+    def __init__(self, db_path, commit_interval=200):
+        """
+        Initialize a crash-safe journal of WARC captures backed by SQLite.
+
+        The validators and payload digest of the last full capture of each URL
+        are kept, for conditional recrawls, together with an index of payload
+        digests to the capture that first stored each body, for deduplication
+        across URLs. Which URLs still need crawling is tracked by the
+        subproject's `Frontier`. The database runs in WAL mode and changes are
+        committed in batches of `commit_interval`. The connection is shared
+        between the crawl loop and the WARC writer thread, so every statement
+        runs under a lock.
+        """
+        super().__init__(db_path, commit_interval)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS captures (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                payload_digest TEXT NOT NULL,
+                record_id TEXT NOT NULL,
+                warc_date TEXT NOT NULL
+            )
+            """
+        )
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS payload_digests (
+                payload_digest TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                record_id TEXT NOT NULL,
+                warc_date TEXT NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_payload_digests_record ON payload_digests (record_id)")
+        self.conn.commit()
+
+    def get_capture(self, url):
+        """
+        Return the last full capture of a URL as a dict, or None if it was never captured.
+
+        `url` in the result is the target URI of the record holding the body,
+        which differs from the requested URL when the capture was deduplicated.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                """
+                SELECT c.etag, c.last_modified, c.payload_digest, c.record_id, c.warc_date, COALESCE(d.url, c.url)
+                FROM captures c LEFT JOIN payload_digests d ON d.record_id = c.record_id
+                WHERE c.url = ?
+                """,
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("etag", "last_modified", "payload_digest", "record_id", "warc_date", "url"), row))
+
+    def find_payload(self, payload_digest):
+        """
+        Return the capture that first stored a payload digest as a dict, or None.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT payload_digest, url, record_id, warc_date FROM payload_digests WHERE payload_digest = ?",
+                (payload_digest,),
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("payload_digest", "url", "record_id", "warc_date"), row))
+
+    def record_payload(self, payload_digest, url, record_id, warc_date):
+        """
+        Register the record that stores a payload, unless one is already registered.
+        """
+        self._execute(
+            """
+            INSERT OR IGNORE INTO payload_digests (payload_digest, url, record_id, warc_date)
+            VALUES (?, ?, ?, ?)
+            """,
+            (payload_digest, url, record_id, warc_date),
+        )
+
+    def record_capture(self, url, etag, last_modified, payload_digest, record_id, warc_date):
+        """
+        Remember the validators and WARC record of a full capture of a URL.
+        """
+        self._execute(
+            """
+            INSERT OR REPLACE INTO captures (url, etag, last_modified, payload_digest, record_id, warc_date)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (url, etag, last_modified, payload_digest, record_id, warc_date),
+        )
+
+    def update_validators(self, url, etag, last_modified):
+        """
+        Refresh the validators of a URL whose content has not changed since its last full capture.
+        """
+        self._execute(
+            """
+            UPDATE captures SET etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+            WHERE url = ?
+            """,
+            (etag, last_modified, url),
+        )
@@ -13,12 +13,12 @@ Instructions:
 
 import os
 import logging
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
+from core.scrapers.browser_pool import get_browser_pool
+from core.scrapers.link_store import LinkStore
+from core.scrapers.frontier import Frontier, frontier_path
+from core.scrapers.link_scraper import EXTRACT_LINKS_SCRIPT
 
 
 class CustomLinkScraper:
@@ -32,27 +32,16 @@ class CustomLinkScraper:
         self.csv_path = os.path.join(self.project_folder, "links.csv")
         self.log_callback = log_callback or (lambda message: None)
         os.makedirs(self.project_folder, exist_ok=True)
-
-        # Create CSV if it doesn't exist
-        if not os.path.exists(self.csv_path):
-            pd.DataFrame(columns=["link"]).to_csv(self.csv_path, index=False)
+        # The links folder sits directly in the subproject folder, next to the frontier
+        self.frontier = Frontier(frontier_path(os.path.dirname(os.path.abspath(self.project_folder))))
+        self.link_store = LinkStore(self.csv_path, frontier=self.frontier)
+        self.current_source = None
 
     def _setup_webdriver(self):
         """
-        Set up Chrome WebDriver with headless options.
+        Lease a headless Chrome from the shared browser pool.
         """
-        options = webdriver.ChromeOptions()
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--headless")
-
-        prefs = {
-            "download.prompt_for_download": False,
-            "download.default_directory": self.project_folder,
-            "profile.default_content_setting_values.automatic_downloads": 1,
-        }
-        options.add_experimental_option("prefs", prefs)
-        return webdriver.Chrome(options=options)
+        return get_browser_pool().acquire(download_dir=self.project_folder)
 
     def _log(self, message):
         """
@@ -63,14 +52,13 @@ class CustomLinkScraper:
 
     def _extract_links(self, link_selector):
         """
-        Extract links using a CSS selector. Users can customize this logic.
+        Extract links using a CSS selector, or a list of selectors, in a single script call.
+        Users can customize this logic.
         """
         try:
             self._log(f"Extracting links using selector: {link_selector}")
-            elements = self.wait.until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, link_selector))
-            )
-            links = {element.get_attribute("href") for element in elements if element.get_attribute("href")}
+            selectors = [link_selector] if isinstance(link_selector, str) else list(link_selector)
+            links = set(self.wait.until(lambda driver: driver.execute_script(EXTRACT_LINKS_SCRIPT, selectors) or False))
             self._log(f"Found {len(links)} unique links.")
             return links
         except TimeoutException:
@@ -87,12 +75,8 @@ class CustomLinkScraper:
         if not links:
             return
         try:
-            existing_links = set(pd.read_csv(self.csv_path)["link"]) if os.path.exists(self.csv_path) else set()
-            new_links = links - existing_links
+            new_links = self.link_store.add(links, source=self.current_source)
             if new_links:
-                pd.DataFrame(new_links, columns=["link"]).to_csv(
-                    self.csv_path, mode="a", header=False, index=False
-                )
                 self._log(f"Saved {len(new_links)} new links.")
         except Exception as e:
             self._log(f"Error saving links: {e}")
@@ -108,3 +92,11 @@ class CustomLinkScraper:
             - Pass URL and link selector to extract and save links.
         """
         self._log("Custom scraping logic not implemented. Please customize the `scrape` method.")
+
+    def close(self):
+        """
+        Flush saved links and hand the WebDriver back to the browser pool.
+        """
+        self.link_store.close()
+        self.frontier.close()
+        get_browser_pool().release(self.driver)
@@ -0,0 +1,67 @@
+import time
+import socket
+import asyncio
+from aiohttp.abc import AbstractResolver
+from aiohttp.resolver import DefaultResolver
+
+
+class CachingResolver(AbstractResolver):
+    def __init__(self, ttl=300, resolver=None):
+        """
+        Initialize the resolver with a per-host cache whose entries expire after `ttl` seconds.
+
+        Lookups are delegated to aiohttp's default resolver, which runs them off the
+        event loop. Concurrent lookups for the same host share a single request.
+        """
+        self.ttl = ttl
+        self._resolver = resolver or DefaultResolver()
+        self._cache = {}
+        self._pending = {}
+        self.lookups = 0
+        self.hits = 0
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        """
+        Resolve a host, serving repeated lookups from the cache while the entry is fresh.
+        """
+        key = (host, family)
+        cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            self.hits += 1
+            addresses = cached[1]
+        else:
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = asyncio.ensure_future(self._lookup(key))
+                self._pending[key] = pending
+                pending.add_done_callback(lambda _: self._pending.pop(key, None))
+            else:
+                self.hits += 1
+            addresses = await asyncio.shield(pending)
+
+        # Entries are cached per host, so stamp the requested port on the way out
+        return [dict(address, port=port) for address in addresses]
+
+    async def _lookup(self, key):
+        """
+        Perform the actual lookup and store the result in the cache.
+        """
+        host, family = key
+        self.lookups += 1
+        addresses = await self._resolver.resolve(host, 0, family)
+        self._cache[key] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    async def ip_address(self, host):
+        """
+        Return the first resolved IP address for a host, e.g. for the WARC-IP-Address header.
+        """
+        addresses = await self.resolve(host, 0, socket.AF_UNSPEC)
+        return addresses[0]["host"]
+
+    async def close(self):
+        """
+        Close the underlying resolver and drop the cache.
+        """
+        self._cache.clear()
+        await self._resolver.close()
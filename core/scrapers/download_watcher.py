@@ -0,0 +1,154 @@
+import os
+import time
+import threading
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+PARTIAL_SUFFIXES = (".crdownload", ".part", ".tmp")
+
+
+class _Download:
+    def __init__(self, link):
+        self.link = link
+        self.started_at = time.monotonic()
+        self.path = None
+        self.finished_at = None
+        self.started = threading.Event()
+        self.finished = threading.Event()
+
+    @property
+    def duration(self):
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+
+class DownloadWatcher(FileSystemEventHandler):
+    def __init__(self, download_folder):
+        """
+        Initialize a watcher that tracks browser downloads in `download_folder` through file events.
+
+        Call `expect(link)` right before navigating to a link. The next file
+        that appears in the folder is attributed to that link and followed
+        through Chrome's `.crdownload` renames until it gets its final name,
+        so each link is mapped to the file it produced and how long it took.
+        """
+        self.download_folder = os.path.abspath(download_folder)
+        self._lock = threading.Lock()
+        self._waiting = []  # Expected downloads whose file has not appeared yet, oldest first
+        self._by_path = {}  # Current path of each download in progress
+        self.downloads = []
+        self._observer = Observer()
+        self._observer.schedule(self, self.download_folder, recursive=False)
+
+    @staticmethod
+    def _is_partial(path):
+        return path.endswith(PARTIAL_SUFFIXES)
+
+    def start(self):
+        """
+        Start listening for file events.
+        """
+        os.makedirs(self.download_folder, exist_ok=True)
+        self._observer.start()
+        return self
+
+    def expect(self, link):
+        """
+        Register a link whose download is about to be triggered.
+        """
+        download = _Download(link)
+        with self._lock:
+            self._waiting.append(download)
+            self.downloads.append(download)
+        return download
+
+    def _track(self, path):
+        if path in self._by_path or os.path.basename(path).startswith("."):
+            return
+        download = self._waiting.pop(0) if self._waiting else None
+        if download is None:
+            return
+        download.path = path
+        download.started.set()
+        if self._is_partial(path):
+            self._by_path[path] = download
+        else:
+            self._finish(download, path)
+
+    def _finish(self, download, path):
+        download.path = path
+        download.finished_at = time.monotonic()
+        download.finished.set()
+
+    def on_created(self, event):
+        if event.is_directory:
+            return
+        with self._lock:
+            self._track(event.src_path)
+
+    def on_moved(self, event):
+        if event.is_directory:
+            return
+        with self._lock:
+            download = self._by_path.pop(event.src_path, None)
+            if download is None:
+                self._track(event.dest_path)
+            elif self._is_partial(event.dest_path):
+                download.path = event.dest_path
+                self._by_path[event.dest_path] = download
+            else:
+                self._finish(download, event.dest_path)
+
+    def on_deleted(self, event):
+        with self._lock:
+            download = self._by_path.pop(event.src_path, None)
+        if download is not None:
+            # Chrome removes the partial file when a download is cancelled
+            download.path = None
+            download.finished_at = time.monotonic()
+            download.finished.set()
+
+    def wait_started(self, download, timeout=10):
+        """
+        Block until the download's file appears, and return whether it did.
+        """
+        if download.started.wait(timeout):
+            return True
+        with self._lock:
+            if download in self._waiting:
+                self._waiting.remove(download)
+        return False
+
+    def wait_all(self, timeout=300):
+        """
+        Block until every started download has finished or `timeout` seconds have passed.
+
+        Returns the downloads that were still in progress at the deadline.
+        """
+        deadline = time.monotonic() + timeout
+        for download in list(self.downloads):
+            if download.started.is_set():
+                download.finished.wait(max(0.0, deadline - time.monotonic()))
+        return [d for d in self.downloads if d.started.is_set() and not d.finished.is_set()]
+
+    def results(self):
+        """
+        Return a mapping of link to `(filename, seconds)` for the downloads that completed.
+        """
+        return {
+            d.link: (os.path.basename(d.path), round(d.duration, 2))
+            for d in self.downloads if d.finished.is_set() and d.path
+        }
+
+    def stop(self):
+        """
+        Stop listening for file events.
+        """
+        self._observer.stop()
+        self._observer.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,216 @@
+import os
+import csv
+import time
+from core.scrapers.sqlite_store import SqliteStore
+
+
+def frontier_path(subproject_folder):
+    """
+    Return the location of a subproject's frontier database.
+    """
+    return os.path.join(subproject_folder, "frontier.sqlite3")
+
+
+class Frontier(SqliteStore):
+    DISCOVERED = "discovered"
+    QUEUED = "queued"
+    FETCHED = "fetched"
+    FAILED = "failed"
+
+    def __init__(self, db_path, commit_interval=200):
+        """
+        Initialize the per-subproject URL frontier backed by SQLite.
+
+        The link scrapers add URLs to it as they are discovered, together with
+        where they were found. Each download stage (`"warc"`, `"pdf"`) then
+        queues the discovered URLs for itself and claims them in batches,
+        recording for every URL whether it was fetched or failed, how many
+        attempts it took and how long the last one ran. Claims from an
+        interrupted run are released at the start of the next one, so a stage
+        can be restarted or partially rerun without reading every URL into
+        memory. Changes are committed in batches of `commit_interval`.
+        """
+        super().__init__(db_path, commit_interval)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                source TEXT,
+                discovered_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                url TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                queued_at REAL NOT NULL,
+                claimed_at REAL,
+                finished_at REAL,
+                duration REAL,
+                PRIMARY KEY (url, stage)
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_stage_state ON tasks (stage, state, claimed_at)")
+        self.conn.commit()
+
+    def add(self, urls, source=None):
+        """
+        Record discovered URLs, ignoring ones already known. Returns how many were new.
+        """
+        now = time.time()
+        with self._lock:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO urls (url, source, discovered_at) VALUES (?, ?, ?)",
+                ((url, source, now) for url in urls if url),
+            )
+            self.commit()
+            return self.conn.total_changes - before
+
+    def add_from_csv(self, csv_path, source=None, batch_size=10000):
+        """
+        Stream the first column of a links CSV into the frontier. Returns how many URLs were new.
+        """
+        added = 0
+        batch = []
+        with open(csv_path, "r", newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader, None)  # Skip the header
+            for row in reader:
+                if row and row[0]:
+                    batch.append(row[0])
+                if len(batch) >= batch_size:
+                    added += self.add(batch, source)
+                    batch = []
+        return added + self.add(batch, source)
+
+    def enqueue(self, stage, retry_failed=True):
+        """
+        Queue every discovered URL the stage has not seen yet, and optionally its failed ones again.
+
+        Returns the number of URLs now waiting for the stage.
+        """
+        with self._lock:
+            self.conn.execute(
+                """
+                INSERT OR IGNORE INTO tasks (url, stage, state, queued_at)
+                SELECT url, ?, ?, ? FROM urls
+                """,
+                (stage, self.QUEUED, time.time()),
+            )
+            if retry_failed:
+                self.conn.execute(
+                    "UPDATE tasks SET state = ?, claimed_at = NULL WHERE stage = ? AND state = ?",
+                    (self.QUEUED, stage, self.FAILED),
+                )
+            self.commit()
+        return self.count(stage, self.QUEUED)
+
+    def reset(self, stage):
+        """
+        Queue every URL of a stage again, including the ones already fetched.
+        """
+        with self._lock:
+            self.conn.execute(
+                "UPDATE tasks SET state = ?, claimed_at = NULL, attempts = 0, last_error = NULL WHERE stage = ?",
+                (self.QUEUED, stage),
+            )
+            self.commit()
+
+    def release_claims(self, stage):
+        """
+        Make URLs claimed by an interrupted run available again.
+        """
+        with self._lock:
+            self.conn.execute(
+                "UPDATE tasks SET claimed_at = NULL WHERE stage = ? AND state = ? AND claimed_at IS NOT NULL",
+                (stage, self.QUEUED),
+            )
+            self.commit()
+
+    def claim(self, stage, batch_size=100):
+        """
+        Claim up to `batch_size` queued URLs for a stage and return them.
+        """
+        with self._lock:
+            urls = [row[0] for row in self.conn.execute(
+                """
+                SELECT url FROM tasks WHERE stage = ? AND state = ? AND claimed_at IS NULL
+                ORDER BY rowid LIMIT ?
+                """,
+                (stage, self.QUEUED, batch_size),
+            )]
+            self.conn.executemany(
+                "UPDATE tasks SET claimed_at = ?, attempts = attempts + 1 WHERE url = ? AND stage = ?",
+                ((time.time(), url, stage) for url in urls),
+            )
+            self.commit()
+        return urls
+
+    def iter_claims(self, stage, batch_size=100):
+        """
+        Yield queued URLs of a stage one by one, claiming them in batches until none are left.
+        """
+        while True:
+            urls = self.claim(stage, batch_size)
+            if not urls:
+                return
+            yield from urls
+
+    def mark_fetched(self, url, stage):
+        """
+        Record that a stage fetched and stored a URL.
+        """
+        self._finish(url, stage, self.FETCHED, None)
+
+    def mark_failed(self, url, stage, error):
+        """
+        Record that a stage failed on a URL, keeping the error for later inspection.
+        """
+        self._finish(url, stage, self.FAILED, str(error))
+
+    def _finish(self, url, stage, state, error):
+        now = time.time()
+        self._execute(
+            """
+            UPDATE tasks SET state = ?, last_error = ?, finished_at = ?, duration = ? - COALESCE(claimed_at, ?)
+            WHERE url = ? AND stage = ?
+            """,
+            (state, error, now, now, now, url, stage),
+        )
+
+    def count(self, stage, state):
+        """
+        Return the number of URLs of a stage in the given state.
+        """
+        with self._lock:
+            if state == self.DISCOVERED:
+                return self.conn.execute(
+                    """
+                    SELECT COUNT(*) FROM urls u
+                    WHERE NOT EXISTS (SELECT 1 FROM tasks t WHERE t.url = u.url AND t.stage = ?)
+                    """,
+                    (stage,),
+                ).fetchone()[0]
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE stage = ? AND state = ?", (stage, state)
+            ).fetchone()[0]
+
+    def summary(self, stage):
+        """
+        Return a mapping of state to the number of URLs of a stage in that state.
+        """
+        with self._lock:
+            counts = dict(self.conn.execute(
+                "SELECT state, COUNT(*) FROM tasks WHERE stage = ? GROUP BY state", (stage,)
+            ))
+        discovered = self.count(stage, self.DISCOVERED)
+        if discovered:
+            counts[self.DISCOVERED] = discovered
+        return counts
@@ -0,0 +1,75 @@
+import asyncio
+from collections import deque
+from urllib.parse import urlsplit
+
+
+async def run_per_host(links, handle, max_concurrency, max_per_host, lookahead=None):
+    """
+    Await `handle(url)` for every link, at most `max_concurrency` at once and `max_per_host` per host.
+
+    URLs wait in per-host queues and a worker only takes a URL from a host
+    with a free slot, so workers never sit on one busy host while others have
+    work. Up to `lookahead` URLs (default `max_concurrency * 32`) are read
+    ahead from `links`, so hosts further down the list get started early.
+    """
+    lookahead = lookahead or max_concurrency * 32
+    pending = {}
+    in_flight = {}
+    ready = deque()
+    ready_hosts = set()
+    buffered = 0
+    exhausted = False
+    changed = asyncio.Condition()
+
+    def mark_ready(host):
+        if host not in ready_hosts and pending.get(host) and in_flight.get(host, 0) < max_per_host:
+            ready.append(host)
+            ready_hosts.add(host)
+
+    async def feed():
+        nonlocal buffered, exhausted
+        try:
+            for url in links:
+                async with changed:
+                    await changed.wait_for(lambda: buffered < lookahead)
+                    host = urlsplit(url).netloc
+                    pending.setdefault(host, deque()).append(url)
+                    buffered += 1
+                    mark_ready(host)
+                    changed.notify_all()
+        finally:
+            async with changed:
+                exhausted = True
+                changed.notify_all()
+
+    async def worker():
+        nonlocal buffered
+        while True:
+            async with changed:
+                await changed.wait_for(lambda: ready or (exhausted and not buffered))
+                if not ready:
+                    return
+                host = ready.popleft()
+                ready_hosts.discard(host)
+                url = pending[host].popleft()
+                if not pending[host]:
+                    del pending[host]
+                buffered -= 1
+                in_flight[host] = in_flight.get(host, 0) + 1
+                # Round-robin: the host goes to the back of the line if it can take more
+                mark_ready(host)
+                changed.notify_all()
+            try:
+                await handle(url)
+            finally:
+                async with changed:
+                    in_flight[host] -= 1
+                    mark_ready(host)
+                    changed.notify_all()
+
+    tasks = [asyncio.create_task(feed())] + [asyncio.create_task(worker()) for _ in range(max_concurrency)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -1,70 +1,187 @@
 import os
-import logging
 import time
-import pandas as pd
-from selenium import webdriver
+import queue
+import asyncio
+import logging
+import threading
+from contextlib import AsyncExitStack
+from concurrent.futures import ThreadPoolExecutor, wait
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from core.scrapers.browser_pool import get_browser_pool
+from core.scrapers.link_store import LinkStore
+from core.scrapers.frontier import Frontier, frontier_path
+from core.scrapers.site_settings import SiteSettings
+from core.scrapers.static_links import StaticLinkExtractor
 from core.scrapers.crawl_4ai import Crawl4aiCrawler
+from core.scrapers.request_blocking import (RequestBlockingPolicy, DEFAULT_DENIED_DOMAINS, RESOURCE_TIMING_BUFFER_SCRIPT,
+                                            TRANSFER_SIZE_SCRIPT)
+
+# Collects the absolute hrefs matched by a list of CSS selectors
+COLLECT_LINKS_JS = """
+function collectLinks(selectors) {
+    const links = new Set();
+    for (const selector of selectors) {
+        for (const element of document.querySelectorAll(selector)) {
+            const anchors = element.href !== undefined ? [element] : element.querySelectorAll("a[href]");
+            for (const anchor of anchors) {
+                const href = typeof anchor.href === "string" ? anchor.href : anchor.getAttribute("href");
+                if (href) links.add(href);
+            }
+        }
+    }
+    return links;
+}
+"""
+
+# Returns all links in one WebDriver round-trip and remembers them in the page as seen
+EXTRACT_LINKS_SCRIPT = COLLECT_LINKS_JS + """
+const links = Array.from(collectLinks(arguments[0]));
+window.__seenLinks = window.__seenLinks || new Set();
+for (const link of links) window.__seenLinks.add(link);
+return links;
+"""
+
+# Resolves true as soon as a link not seen yet shows up, or false when the timeout (ms) passes
+WAIT_FOR_NEW_LINKS_SCRIPT = COLLECT_LINKS_JS + """
+const [selectors, timeout] = arguments;
+const done = arguments[arguments.length - 1];
+const seenLinks = window.__seenLinks || new Set();
+const hasNewLinks = () => {
+    for (const link of collectLinks(selectors)) {
+        if (!seenLinks.has(link)) return true;
+    }
+    return false;
+};
+if (hasNewLinks()) {
+    done(true);
+} else {
+    let timer = null;
+    const observer = new MutationObserver(() => {
+        if (hasNewLinks()) {
+            observer.disconnect();
+            clearTimeout(timer);
+            done(true);
+        }
+    });
+    observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, attributeFilter: ["href"]});
+    timer = setTimeout(() => { observer.disconnect(); done(false); }, timeout);
+}
+"""
 
 class LinkScraper:
-    def __init__(self, project_folder, log_callback=None):
+    def __init__(self, project_folder, log_callback=None, content_timeout=5, request_blocking=None):
         """
         Initialize the LinkScraper with WebDriver and configurations.
+
+        `content_timeout` caps each wait for new links in seconds; `request_blocking` is a `RequestBlockingPolicy`.
         """
         self.project_folder = project_folder
-        self.driver = self._setup_webdriver()
-        self.wait = WebDriverWait(self.driver, 20)
+        self.content_timeout = content_timeout
+        self.request_blocking = request_blocking
+        self._run_stats_lock = threading.Lock()
+        self._reset_run_stats()
+        # Each worker thread leases its own driver; messages from workers are relayed by the main thread
+        self._local = threading.local()
+        self._main_thread = threading.current_thread()
+        self._messages = queue.Queue()
         self.csv_path = os.path.join(self.project_folder, "links.csv")
         self.log_callback = log_callback or (lambda message: None)
         self.multiple_links=False
         os.makedirs(self.project_folder, exist_ok=True)
 
-
-        # Create CSV if it doesn't exist
-        if not os.path.exists(self.csv_path):
-            pd.DataFrame(columns=["link"]).to_csv(self.csv_path, index=False)
+        # The links folder sits directly in the subproject folder, next to the frontier
+        subproject_folder = os.path.dirname(os.path.abspath(self.project_folder))
+        self.frontier = Frontier(frontier_path(subproject_folder))
+        self.link_store = LinkStore(self.csv_path, frontier=self.frontier)
+        self.site_settings = SiteSettings(os.path.join(subproject_folder, "site_settings.json"))
 
     def _setup_webdriver(self):
         """
-        Set up Chrome WebDriver with headless options.
+        Lease a headless Chrome from the shared browser pool.
         """
-        options = webdriver.ChromeOptions()
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--headless")
+        return get_browser_pool().acquire(download_dir=self.project_folder)
 
-        prefs = {
-            "download.prompt_for_download": False,
-            "download.default_directory": self.project_folder,
-            "profile.default_content_setting_values.automatic_downloads": 1,
-        }
-        options.add_experimental_option("prefs", prefs)
-        return webdriver.Chrome(options=options)
+    @property
+    def driver(self):
+        """
+        The current thread's WebDriver, leased on first use so browserless runs never start one.
+        """
+        driver = getattr(self._local, "driver", None)
+        if driver is None:
+            driver = self._local.driver = self._setup_webdriver()
+            driver.set_script_timeout(self.content_timeout + 10)
+            self._local.wait = WebDriverWait(driver, 20)
+        return driver
+
+    @property
+    def wait(self):
+        self.driver
+        return self._local.wait
+
+    def _release_driver(self):
+        """
+        Hand the current thread's WebDriver back to the browser pool.
+        """
+        driver = getattr(self._local, "driver", None)
+        if driver is not None:
+            self._local.driver = None
+            get_browser_pool().release(driver)
+
+    @property
+    def current_source(self):
+        """
+        The page or template the current thread is collecting links from.
+        """
+        return getattr(self._local, "source", None)
+
+    @current_source.setter
+    def current_source(self, value):
+        self._local.source = value
 
     def _log(self, message):
         """
-        Log messages through the callback.
+        Log messages through the callback; messages from worker threads are relayed by the main thread.
         """
         logging.info(message)
-        self.log_callback(message)
+        if threading.current_thread() is self._main_thread:
+            self.log_callback(message)
+        else:
+            self._messages.put((self.log_callback, (message,)))
+
+    def _progress(self, progress_callback, value, message):
+        if not progress_callback:
+            return
+        if threading.current_thread() is self._main_thread:
+            progress_callback(value, message)
+        else:
+            self._messages.put((progress_callback, (value, message)))
+
+    def _relay_messages(self):
+        while True:
+            try:
+                callback, args = self._messages.get_nowait()
+            except queue.Empty:
+                return
+            callback(*args)
 
     def _extract_links(self, link_selector):
         """
-        Extract links using a CSS selector.
+        Extract links using a CSS selector, or a list of selectors, in a single script call.
+
+        Waits until at least one link is present.
         """
+        selectors = [link_selector] if isinstance(link_selector, str) else list(link_selector)
         try:
-            self._log(f"Extracting links using selector: {link_selector}")
-            elements = self.wait.until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, link_selector))
-            )
-            links = {element.get_attribute("href") for element in elements if element.get_attribute("href")}
+            self._log(f"Extracting links using selector: {', '.join(selectors)}")
+            links = self.wait.until(lambda driver: driver.execute_script(EXTRACT_LINKS_SCRIPT, selectors) or False)
+            links = set(links)
             self._log(f"Found {len(links)} unique links.")
             return links
         except TimeoutException:
-            self._log(f"Timeout while extracting links with selector: {link_selector}")
+            self._log(f"Timeout while extracting links with selector: {', '.join(selectors)}")
             return set()
         except Exception as e:
             self._log(f"Error while extracting links: {e}")
@@ -77,45 +194,125 @@ class LinkScraper:
         if not links:
             return
         try:
-            existing_links = set(pd.read_csv(self.csv_path)["link"]) if os.path.exists(self.csv_path) else set()
-            new_links = set(links) - existing_links
+            new_links = self.link_store.add(links, source=self.current_source)
             if new_links:
-                pd.DataFrame(new_links, columns=["link"]).to_csv(
-                    self.csv_path, mode="a", header=False, index=False
-                )
                 self._log(f"Saved {len(new_links)} new links.")
         except Exception as e:
             self._log(f"Error saving links: {e}")
 
+    def _reset_run_stats(self):
+        with self._run_stats_lock:
+            self._run_stats = {"waits": 0, "wasted": 0, "waited": 0.0, "wasted_time": 0.0,
+                               "pages": 0, "bytes": 0, "started": time.monotonic()}
+
+    def _prepare_tab(self, url):
+        """
+        Set up the current thread's browser tab to record resource timings and block requests before loading `url`.
+        """
+        try:
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": RESOURCE_TIMING_BUFFER_SCRIPT})
+        except Exception as e:
+            logging.info(f"Could not enlarge the resource timing buffer: {e}")
+        if self.request_blocking is None:
+            return
+        try:
+            self.request_blocking.for_site(self.site_settings, url).apply(self.driver)
+        except Exception as e:
+            self._log(f"Could not set up request blocking: {e}")
+
+    def _record_page(self):
+        """
+        Count a loaded page and the bytes its document and resources transferred so far.
+        """
+        try:
+            transferred = self.driver.execute_script(TRANSFER_SIZE_SCRIPT) or 0
+        except Exception as e:
+            logging.info(f"Could not read transfer sizes: {e}")
+            transferred = 0
+        with self._run_stats_lock:
+            self._run_stats["pages"] += 1
+            self._run_stats["bytes"] += transferred
+
+    def _wait_for_new_links(self, link_selector):
+        """
+        Wait until a link not yet extracted from this page matches the selector, for at most `content_timeout` seconds.
+
+        Returns whether new links appeared.
+        """
+        selectors = [link_selector] if isinstance(link_selector, str) else list(link_selector)
+        started = time.monotonic()
+        try:
+            found = self.driver.execute_async_script(
+                WAIT_FOR_NEW_LINKS_SCRIPT, selectors, int(self.content_timeout * 1000)
+            )
+        except Exception as e:
+            if "unloaded" not in str(e).lower():
+                logging.info(f"Waiting for new links failed: {e}")
+                found = False
+            else:
+                # A navigation, e.g. after a Next button click, aborts the script; the new page is the new content
+                found = True
+        elapsed = time.monotonic() - started
+        with self._run_stats_lock:
+            self._run_stats["waits"] += 1
+            self._run_stats["waited"] += elapsed
+            if not found:
+                self._run_stats["wasted"] += 1
+                self._run_stats["wasted_time"] += elapsed
+        return bool(found)
+
+    def _report_run_stats(self):
+        with self._run_stats_lock:
+            stats = dict(self._run_stats)
+        if stats["pages"]:
+            minutes = max(time.monotonic() - stats["started"], 1) / 60
+            blocking = "on" if self.request_blocking is not None else "off"
+            self._log(
+                f"Loaded {stats['pages']} pages at {stats['pages'] / minutes:.1f} pages per minute, "
+                f"transferring {stats['bytes'] / 1e6:.1f} MB (request blocking {blocking})."
+            )
+        if stats["waits"]:
+            self._log(
+                f"Waited for new content {stats['waits']} times ({stats['waited']:.1f}s); "
+                f"{stats['wasted']} waits ended without new links ({stats['wasted_time']:.1f}s wasted)."
+            )
+
     def _scroll_and_load(self, link_selector, load_more_selector=None):
         """
         Scroll through the page and optionally click a "Load More" button.
+
+        After each scroll or click, waits only until new links show up.
         """
+        seen_links = self._extract_links(link_selector)
+        self._save_links(seen_links)
         last_height = self.driver.execute_script("return document.body.scrollHeight")
         while True:
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            links = self._extract_links(link_selector)
-            self._save_links(links)
-            time.sleep(2)
+            found = self._wait_for_new_links(link_selector)
 
             if load_more_selector:
                 try:
                     button = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, load_more_selector)))
                     button.click()
                     self._log("Clicked 'Load More' button.")
-                    time.sleep(2)
+                    found = self._wait_for_new_links(link_selector) or found
                 except Exception as e:
                     self._log(f"Load more button interaction failed: {e}")
 
+            if found:
+                links = self._extract_links(link_selector)
+                self._save_links(links - seen_links)
+                seen_links |= links
+
             new_height = self.driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
+            if new_height == last_height and not found:
                 break
             last_height = new_height
 
-    def _scroll_and_load_only(self, link_selector, footer_selector, max_scrolls=50, wait_time=3, max_repeats=3):
+    def _scroll_and_load_only(self, link_selector, footer_selector, max_scrolls=50, max_repeats=3):
         """
         Scroll through the page and load more content by scrolling near the footer.
-        Stops when the same set of links is observed for a specified number of consecutive scrolls.
+        Stops when no new links appear for a specified number of consecutive scrolls.
         """
         seen_links = set()
         scroll_count = 0
@@ -133,10 +330,9 @@ class LinkScraper:
                 self._log(f"Footer not found or could not calculate position: {e}")
                 break
 
-            time.sleep(wait_time) 
-
-            links = self._extract_links(link_selector)
-            new_links = set(links) - seen_links  
+            new_links = set()
+            if self._wait_for_new_links(link_selector):
+                new_links = self._extract_links(link_selector) - seen_links
             if new_links:
                 seen_links.update(new_links) 
                 repeat_count = 0
@@ -147,18 +343,168 @@ class LinkScraper:
             self._save_links(new_links)
 
             if repeat_count >= max_repeats:
-                self._log(f"Same links observed for {max_repeats} consecutive scrolls. Stopping scrolling.")
+                self._log(f"No new links for {max_repeats} consecutive scrolls. Stopping scrolling.")
                 break
             scroll_count += 1
 
         self._log(f"Scrolling finished after {scroll_count} scrolls. Total links collected: {len(seen_links)}.")
 
+    async def _find_last_pages(self, templates, extractor, crawl_in_browser, max_probe_page=10000,
+                               max_probe_attempts=3):
+        """
+        Find the last page of `(template, link_selector)` pagination templates by probing pages 1, 2, 4, 8, ...
+
+        Returns the last page per template and the links of every probed page.
+        """
+        selectors = dict(templates)
+        # Per template: the highest page known to have links, and the lowest known not to
+        bounds = {template: [0, None] for template in selectors}
+        browser_templates = {template for template in selectors if self.site_settings.get(template, "requires_js", False)}
+        first_links = {}
+        probed = {}
+        attempts = {}
+
+        while True:
+            round_pages = {}
+            for template, (good, bad) in bounds.items():
+                if bad is None:
+                    if good >= max_probe_page:
+                        bounds[template][1] = good + 1
+                        continue
+                    page = min(max(1, good * 2), max_probe_page)
+                elif bad - good > 1:
+                    page = (good + bad) // 2
+                else:
+                    continue
+                round_pages[template.format(page_number=page)] = (template, page)
+            if not round_pages:
+                break
+
+            static_pages = [(url, selectors[template]) for url, (template, _) in round_pages.items()
+                            if template not in browser_templates]
+            static_results = await extractor.extract_all(static_pages) if static_pages else {}
+            results = {url: links for url, links in static_results.items() if links is not None}
+            for url, (template, page) in round_pages.items():
+                # A site whose first page shows no links without a browser is probed with one from then on
+                if page == 1 and results.get(url) == set() and template not in browser_templates:
+                    browser_templates.add(template)
+            # Pages that failed over HTTP are retried in the browser
+            browser_pages = [(url, selectors[template]) for url, (template, _) in round_pages.items()
+                             if url not in results or (template in browser_templates and not results[url])]
+            if browser_pages:
+                for url, _ in browser_pages:
+                    results.pop(url, None)
+                await crawl_in_browser(browser_pages, results.__setitem__)
+
+            for url, (template, page) in round_pages.items():
+                links = results.get(url)
+                if links is None:
+                    # Not fetched at all: say nothing about the boundary until the page is retried
+                    attempts[url] = attempts.get(url, 0) + 1
+                    if attempts[url] < max_probe_attempts:
+                        continue
+                    self._log(f"Could not fetch {url} after {attempts[url]} attempts; "
+                              f"treating page {page} as the end of {template}.")
+                    links = set()
+                probed[url] = links
+                if page == 1:
+                    first_links[template] = links
+                    if links and static_results.get(url) == set():
+                        self.site_settings.set(template, "requires_js", True)
+                        self._log(f"Only the browser found links on {template}; it will be used directly next time.")
+                if links and (page == 1 or links != first_links[template]):
+                    bounds[template][0] = page
+                    self.current_source = template
+                    self._save_links(links)
+                else:
+                    bounds[template][1] = page
+
+        for template, (last_page, _) in bounds.items():
+            self._log(f"Found {last_page} pages for {template}.")
+        self._log(f"Probed {len(probed)} pages to find where pagination ends.")
+        return {template: last_page for template, (last_page, _) in bounds.items()}, probed
+
+    def _scrape_pagination(self, templates, max_retries, max_session, memory_threshold):
+        """
+        Scrape the pages of several `(template, link_selector, max_pages)` pagination templates in one go.
+
+        Pages are fetched over plain HTTP first, and those without links are crawled in the browser.
+        """
+        asyncio.run(self._scrape_pagination_async(templates, max_retries, max_session, memory_threshold))
+
+    async def _scrape_pagination_async(self, templates, max_retries, max_session, memory_threshold):
+        extractor = StaticLinkExtractor(log_callback=self._log)
+        crawler = Crawl4aiCrawler(max_retries, max_session, memory_threshold)
+        async with AsyncExitStack() as stack:
+            browser = None
+
+            async def crawl_in_browser(pages, on_links):
+                # One browser serves every probe round and the final batch; it starts on first use
+                nonlocal browser
+                if browser is None:
+                    browser = await stack.enter_async_context(crawler.open_browser())
+                return await crawler.crawl_batch(pages, on_links, browser)
+
+            await self._crawl_templates(templates, extractor, crawl_in_browser)
+
+    async def _crawl_templates(self, templates, extractor, crawl_in_browser):
+        last_pages, probed = {}, {}
+        unknown = [(template, link_selector) for template, link_selector, max_page_limit in templates if not max_page_limit]
+        if unknown:
+            last_pages, probed = await self._find_last_pages(unknown, extractor, crawl_in_browser)
+
+        pages = {}
+        template_pages = {}
+        for template, link_selector, max_page_limit in templates:
+            last_page = max_page_limit or last_pages.get(template, 0)
+            # Pages whose links were already found while probing are not fetched again
+            urls = [template.format(page_number=page) for page in range(1, last_page + 1)]
+            urls = [url for url in urls if not probed.get(url)]
+            template_pages[template] = urls
+            pages.update((url, link_selector) for url in urls)
+
+        static_pages = [
+            (url, pages[url]) for template, urls in template_pages.items()
+            if not self.site_settings.get(template, "requires_js", False) for url in urls
+        ]
+        static_results = await extractor.extract_all(static_pages) if static_pages else {}
+        for template, urls in template_pages.items():
+            self.current_source = template
+            for url in urls:
+                self._save_links(static_results.get(url))
+        browser_pages = [(url, selector) for url, selector in pages.items() if not static_results.get(url)]
+        self._log(f"Fetched {len(pages) - len(browser_pages)} of {len(pages)} pages without a browser.")
+        if not browser_pages:
+            return
+
+        page_templates = {url: template for template, urls in template_pages.items() for url in urls}
+
+        def on_links(url, links):
+            # Persist each page's links as soon as the page is crawled
+            self.current_source = page_templates.get(url)
+            self._save_links(links)
+            self.link_store.flush()
+
+        link_counts = await crawl_in_browser(browser_pages, on_links)
+        for template, urls in template_pages.items():
+            found = any(link_counts.get(url) for url in urls)
+            if found and not any(static_results.get(url) for url in urls):
+                self.site_settings.set(template, "requires_js", True)
+                self._log(f"Only the browser found links on {template}; it will be used directly next time.")
+
     def scrape(self, base_urls, link_selectors, pagination_url=None, next_button_selector=None,
                 load_more_selector=None, have_load_more_button=False, custom_strategy=None, 
-                max_pages=None, progress_callback=None, multiple_links=True, max_retries=2, max_session=5, memory_threshold=0.9):
+                max_pages=None, progress_callback=None, multiple_links=True, max_retries=2, max_session=5, memory_threshold=0.9,
+                js_sites=None, max_workers=1):
         """
         Perform the scraping using the specified strategy.
+
+        `js_sites` are always fetched in a browser, and `max_workers` sites are scraped at once.
         """
+        for site in js_sites or []:
+            self.site_settings.set(site, "requires_js", True)
+        self._reset_run_stats()
+
         # Ensure max_pages is a list and aligns with base_urls
         if not isinstance(max_pages, list):
             max_pages = [max_pages] * len(base_urls)
@@ -175,70 +521,119 @@ class LinkScraper:
         else:
             url_selector_pairs = [(base_urls, link_selectors, pagination_url if pagination_url else None, max_pages[0])]
         
-        for current_url, link_selector, next_page, max_page_limit in url_selector_pairs:
+        if pagination_url:
             try:
-                # self._log(f"Starting scraping at {current_url}")
-                
-                if pagination_url:
-                    crawler = Crawl4aiCrawler(max_retries, max_session, memory_threshold)
+                self._scrape_pagination(
+                    [(template, link_selector, max_page_limit)
+                     for _, link_selector, template, max_page_limit in url_selector_pairs],
+                    max_retries, max_session, memory_threshold,
+                )
+            except Exception as e:
+                self._log(f"Scraping process failed: {e}")
+            return
 
-                    urls = [next_page.format(page_number=page) for page in range(1, max_page_limit + 1)]
-                    result = crawler.run_scrap(urls, link_selector)
+        if max_workers > 1 and len(url_selector_pairs) > 1:
+            self._scrape_sites_parallel(url_selector_pairs, max_workers, next_button_selector, load_more_selector,
+                                        have_load_more_button, custom_strategy, progress_callback)
+        else:
+            for current_url, link_selector, next_page, max_page_limit in url_selector_pairs:
+                self._scrape_site(current_url, link_selector, next_page, max_page_limit, next_button_selector,
+                                  load_more_selector, have_load_more_button, custom_strategy, progress_callback)
+        self._report_run_stats()
 
-                    self._save_links(result)
-                else:
+    def _scrape_sites_parallel(self, url_selector_pairs, max_workers, next_button_selector, load_more_selector,
+                               have_load_more_button, custom_strategy, progress_callback):
+        """
+        Scrape one site per worker thread, each in its own browser leased from the pool.
 
-                    current_page = 1
-                    self.driver.get(current_url)
-
-                    while current_page <= max_page_limit:
-                        self._log(f"Processing page {current_page} of {max_page_limit}")
-                        
-                        if custom_strategy:
-                            self._log("Using custom strategy.")
-                            self._apply_custom_strategy(custom_strategy)
-                            break
-                        
-                        if next_button_selector:
-                            try:
-
-                                next_button = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, next_page)))
-                                next_button.click()
-                                links = self._extract_links(link_selector)
-                                self._save_links(links)
-                                current_page += 1
-                            except (TimeoutException, NoSuchElementException):
-                                self._log("No more pages to navigate.")
-                                break
-                        elif load_more_selector:
-                            if have_load_more_button:
-                                self._scroll_and_load(link_selector, load_more_selector)
-                            else:
-                                self._scroll_and_load_only(link_selector, load_more_selector)
-                            break
-                        else:
-                            self._log("No pagination strategy defined, ending scrape.")
-                            break
-
-                        if progress_callback:
-                            progress_value = min(current_page / max_page_limit, 1.0)
-                            progress_callback(progress_value, f"Page {current_page} of {max_page_limit}")
-            except Exception as e:
-                self._log(f"Scraping process failed: {e}")
+        Links from all workers go into the shared link store.
+        """
+        pool = get_browser_pool()
+        if pool.size < max_workers:
+            pool.resize(max_workers)
+        self._log(f"Scraping {len(url_selector_pairs)} sites with {max_workers} parallel browsers.")
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="link-scraper") as executor:
+            futures = [
+                executor.submit(self._scrape_site, current_url, link_selector, next_page, max_page_limit,
+                                next_button_selector, load_more_selector, have_load_more_button, custom_strategy,
+                                progress_callback)
+                for current_url, link_selector, next_page, max_page_limit in url_selector_pairs
+            ]
+            pending = set(futures)
+            while pending:
+                _, pending = wait(pending, timeout=0.5)
+                self._relay_messages()
+        self._relay_messages()
+
+    def _scrape_site(self, current_url, link_selector, next_page, max_page_limit, next_button_selector,
+                     load_more_selector, have_load_more_button, custom_strategy, progress_callback):
+        """
+        Scrape one site with the Next Button or Scroll/Load More strategy.
+        """
+        try:
+            # self._log(f"Starting scraping at {current_url}")
+            self.current_source = current_url
 
+            current_page = 1
+            page_links = set()
+            self._prepare_tab(current_url)
+            self.driver.get(current_url)
 
-   
+            while current_page <= max_page_limit:
+                self._log(f"Processing page {current_page} of {max_page_limit}")
+                
+                if custom_strategy:
+                    self._log("Using custom strategy.")
+                    self._apply_custom_strategy(custom_strategy)
+                    break
+                
+                if next_button_selector:
+                    try:
+
+                        next_button = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, next_page)))
+                        self._record_page()
+                        next_button.click()
+                        if page_links:
+                            # Wait for the next page's links rather than reading the old ones again
+                            self._wait_for_new_links(link_selector)
+                        page_links = self._extract_links(link_selector)
+                        self._save_links(page_links)
+                        current_page += 1
+                    except (TimeoutException, NoSuchElementException):
+                        self._log("No more pages to navigate.")
+                        break
+                elif load_more_selector:
+                    if have_load_more_button:
+                        self._scroll_and_load(link_selector, load_more_selector)
+                    else:
+                        self._scroll_and_load_only(link_selector, load_more_selector)
+                    break
+                else:
+                    self._log("No pagination strategy defined, ending scrape.")
+                    break
+
+                progress_value = min(current_page / max_page_limit, 1.0)
+                self._progress(progress_callback, progress_value, f"{current_url}: page {current_page} of {max_page_limit}")
+        except Exception as e:
+            self._log(f"Scraping process failed: {e}")
+        finally:
+            if getattr(self._local, "driver", None) is not None:
+                self._record_page()
+            self._release_driver()
 
     def close(self):
         """
-        Close the WebDriver.
+        Flush saved links and hand the WebDriver back to the browser pool.
         """
-        self.driver.quit()
+        self.link_store.close()
+        self.frontier.close()
+        self._release_driver()
 
 
 def scrapelinksmain(project_folder, base_url, link_selector, pagination_url=None,
                     next_button_selector=None, load_more_selector=None, have_load_more_button=None,
-                    custom_strategy=None, max_pages=5,multiple_links=False,max_retries=2,max_session=5,max_memory=0.9):
+                    custom_strategy=None, max_pages=5,multiple_links=False,max_retries=2,max_session=5,max_memory=0.9,
+                    js_sites=None, max_workers=1, block_requests=True, blocked_domains=None):
     """
     Main function for scraping links with real-time logging and progress tracking.
     """
@@ -256,7 +651,10 @@ def scrapelinksmain(project_folder, base_url, link_selector, pagination_url=None
     def progress_callback(value, message):
         progress_placeholder.progress(value, text=message)
 
-    scraper = LinkScraper(project_folder, log_callback)
+    request_blocking = None
+    if block_requests:
+        request_blocking = RequestBlockingPolicy(deny_domains=DEFAULT_DENIED_DOMAINS + tuple(blocked_domains or ()))
+    scraper = LinkScraper(project_folder, log_callback, request_blocking=request_blocking)
 
     try:
         scraper.scrape(
@@ -272,7 +670,9 @@ def scrapelinksmain(project_folder, base_url, link_selector, pagination_url=None
             multiple_links=multiple_links,
             max_retries=max_retries,
             max_session=max_session,
-            memory_threshold=max_memory
+            memory_threshold=max_memory,
+            js_sites=js_sites,
+            max_workers=max_workers
         )
     except Exception as e:
         log_callback(f"Scraping failed: {e}")
@@ -0,0 +1,84 @@
+import os
+import csv
+import threading
+
+
+class LinkStore:
+    def __init__(self, csv_path, flush_every=500, frontier=None):
+        """
+        Initialize an append-only store of unique links backed by a one-column CSV.
+
+        The existing file is read once into an in-memory seen-set; after that,
+        adding links costs time in the number of new links only. New links are
+        buffered and appended in batches of `flush_every`, and recorded as
+        discovered in the subproject's `Frontier` if one is given. The store
+        is thread-safe, so several scraping workers can share it.
+        """
+        self.csv_path = csv_path
+        self.flush_every = flush_every
+        self.frontier = frontier
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._seen = set()
+
+        if os.path.exists(self.csv_path) and os.path.getsize(self.csv_path) > 0:
+            with open(self.csv_path, "r", newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                next(reader, None)  # Skip header row
+                self._seen.update(row[0] for row in reader if row)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(self.csv_path)), exist_ok=True)
+            with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerow(["link"])
+
+    def __len__(self):
+        with self._lock:
+            return len(self._seen)
+
+    def __contains__(self, link):
+        with self._lock:
+            return link in self._seen
+
+    def add(self, links, source=None):
+        """
+        Record links found on `source` and return the ones that were not seen before.
+        """
+        with self._lock:
+            new_links = [link for link in dict.fromkeys(links) if link and link not in self._seen]
+            self._seen.update(new_links)
+            self._buffer.extend((link, source) for link in new_links)
+            if len(self._buffer) >= self.flush_every:
+                self._flush()
+        return new_links
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        with open(self.csv_path, "a", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows([link] for link, _ in self._buffer)
+        if self.frontier is not None:
+            by_source = {}
+            for link, source in self._buffer:
+                by_source.setdefault(source, []).append(link)
+            for source, links in by_source.items():
+                self.frontier.add(links, source)
+        self._buffer = []
+
+    def flush(self):
+        """
+        Append buffered links to the CSV file.
+        """
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """
+        Flush what is left in the buffer.
+        """
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,403 @@
+import os
+import re
+import json
+import base64
+import asyncio
+import hashlib
+import logging
+from urllib.parse import urlsplit, unquote
+
+import aiohttp
+from core.scrapers.politeness import BROWSER_USER_AGENT, PolitenessScheduler, polite_get
+from core.scrapers.pdf_store import sha256_file
+from core.scrapers.host_queue import run_per_host
+
+PDF_MAGIC = b"%PDF-"
+PDF_CONTENT_TYPES = ("application/pdf", "application/x-pdf", "application/octet-stream", "binary/octet-stream")
+CONTENT_RANGE = re.compile(r"^bytes (?P<start>\d+)-(?P<end>\d+)/(?P<total>\d+|\*)$")
+RESUMABLE_ERRORS = (aiohttp.ClientPayloadError, aiohttp.ServerDisconnectedError,
+                    aiohttp.ClientOSError, asyncio.TimeoutError)
+
+
+class NeedsBrowser(Exception):
+    """
+    Raised when a link does not serve a PDF directly and has to be opened in a browser.
+    """
+
+
+def sanitize_filename(name):
+    """
+    Turn an untrusted filename into a safe `.pdf` file name.
+    """
+    name = os.path.basename(unquote(name or "").replace("\\", "/")).strip()
+    name = re.sub(r'[<>:"/\\|?*\x00-\x1f]', "_", name).strip(". ")
+    if not name:
+        name = "download"
+    if not name.lower().endswith(".pdf"):
+        name += ".pdf"
+    return name
+
+
+def expected_digests(headers):
+    """
+    Collect the whole-file checksums a server announced, as a mapping of algorithm to hex digest.
+
+    Understands `Repr-Digest` (RFC 9530), `Digest` (RFC 3230) and `Content-MD5`
+    for SHA-256 and MD5.
+    """
+    digests = {}
+    for header in ("Repr-Digest", "Digest"):
+        for item in headers.get(header, "").split(","):
+            algorithm, _, value = item.strip().partition("=")
+            algorithm = {"sha-256": "sha256", "md5": "md5"}.get(algorithm.strip().lower())
+            if algorithm and value:
+                try:
+                    digests.setdefault(algorithm, base64.b64decode(value.strip().strip(":")).hex())
+                except ValueError:
+                    pass
+    if headers.get("Content-MD5"):
+        try:
+            digests.setdefault("md5", base64.b64decode(headers["Content-MD5"].strip()).hex())
+        except ValueError:
+            pass
+    return digests
+
+
+def file_digest(path, algorithm, chunk_size=1024 * 1024):
+    """
+    Return the hex digest of a file with the given hashlib algorithm.
+    """
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PdfDownloader:
+    STAGE = "pdf"
+
+    def __init__(self, output_folder, max_concurrency=8, max_per_host=4, chunk_size=256 * 1024,
+                 request_timeout=600, max_retries=3, segments=4, segment_threshold=64 * 1024 * 1024,
+                 scheduler=None, store=None, user_agent=BROWSER_USER_AGENT, log_callback=None):
+        """
+        Initialize an async PDF downloader writing into `output_folder`.
+
+        Up to `max_concurrency` downloads run at once (`max_per_host` per
+        site), each streamed to disk in `chunk_size` pieces. Requests are
+        paced by the shared politeness scheduler. Files of at least
+        `segment_threshold` bytes on servers that accept ranges are fetched as
+        `segments` parallel byte ranges. Unfinished downloads are kept as
+        `.part` files and resumed with Range requests. With a `PdfStore`,
+        finished files are handed to the store and `output_folder` is only a
+        staging area.
+        """
+        self.output_folder = output_folder
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.chunk_size = chunk_size
+        self.request_timeout = request_timeout
+        self.max_retries = max_retries
+        self.segments = segments
+        self.segment_threshold = segment_threshold
+        self.user_agent = user_agent
+        self.scheduler = scheduler or PolitenessScheduler(user_agent=user_agent)
+        self.store = store
+        self.log_callback = log_callback or (lambda msg: None)
+        self.logger = logging.getLogger("PDFScraper")
+        os.makedirs(self.output_folder, exist_ok=True)
+
+    def _log(self, message):
+        self.logger.info(message)
+        self.log_callback(message)
+
+    def _filename_for(self, response, url):
+        """
+        Pick a file name from Content-Disposition, falling back to the URL path.
+        """
+        disposition = response.content_disposition
+        name = disposition.filename if disposition and disposition.filename else None
+        if not name:
+            name = urlsplit(str(response.url)).path.rstrip("/").split("/")[-1] or urlsplit(url).netloc
+        return sanitize_filename(name)
+
+    def _unique_path(self, filename):
+        """
+        Return a path in the output folder that does not clash with an existing file.
+        """
+        stem, ext = os.path.splitext(filename)
+        path = os.path.join(self.output_folder, filename)
+        counter = 1
+        while os.path.exists(path):
+            path = os.path.join(self.output_folder, f"{stem} ({counter}){ext}")
+            counter += 1
+        return path
+
+    def _part_paths(self, url):
+        """
+        Return the partial file and its state file for a URL.
+
+        Both are named after the URL, so a later run finds them again.
+        """
+        base = os.path.join(self.output_folder, hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + ".part")
+        return base, base + ".json"
+
+    @staticmethod
+    def _load_state(state_path):
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _save_state(state_path, state):
+        with open(state_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(state_path + ".tmp", state_path)
+
+    @staticmethod
+    def _discard(*paths):
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def _download(self, session, url):
+        """
+        Download one PDF, resuming from a partial file if one was left behind, and return its path.
+
+        Dropped connections are resumed with a Range request up to
+        `max_retries` times; the partial file is kept on disk in between, so
+        even a later run picks up where this one stopped. Raises `NeedsBrowser`
+        when the link answers with a page instead of a PDF (for example a
+        viewer or a JavaScript redirect).
+        """
+        part_path, state_path = self._part_paths(url)
+        state = self._load_state(state_path) if os.path.exists(part_path) else None
+        for attempt in range(self.max_retries + 1):
+            try:
+                state = await self._fetch(session, url, part_path, state_path, state)
+                break
+            except RESUMABLE_ERRORS as e:
+                state = self._load_state(state_path) if os.path.exists(part_path) else None
+                if attempt == self.max_retries or state is None:
+                    raise
+                self._log(f"Connection to {url} dropped ({e.__class__.__name__}), resuming")
+        return self._finish(url, part_path, state_path, state)
+
+    async def _fetch(self, session, url, part_path, state_path, state):
+        """
+        Fetch the missing part of a download into `part_path` and return the download state.
+        """
+        if state and state.get("segments"):
+            return await self._fetch_segments(session, url, part_path, state_path, state)
+
+        headers = {}
+        offset = os.path.getsize(part_path) if state else 0
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            if state.get("validator"):
+                headers["If-Range"] = state["validator"]
+
+        response = await polite_get(session, self.scheduler, url, self.max_retries, headers=headers)
+        if response is None:
+            raise PermissionError("Disallowed by robots.txt")
+        async with response:
+            encoding = response.headers.get("Content-Encoding", "identity").strip().lower()
+            if encoding not in ("", "identity"):
+                raise NeedsBrowser(f"sent a {encoding}-encoded body despite Accept-Encoding: identity")
+            if offset and response.status == 416 and offset == state.get("total"):
+                return state  # The partial file was already complete
+            if offset and response.status == 206:
+                content_range = response.headers.get("Content-Range", "")
+                match = CONTENT_RANGE.match(content_range)
+                if not match or int(match.group("start")) != offset:
+                    raise ValueError(f"unexpected Content-Range {content_range!r} when resuming at {offset}")
+                self._log(f"Resuming {url} at byte {offset}")
+                first_chunk, mode = b"", "ab"
+            else:
+                # A full response: either a fresh download or the file changed since the partial one
+                response.raise_for_status()
+                first_chunk = await self._check_pdf(response)
+                state = {
+                    "url": url,
+                    "filename": self._filename_for(response, url),
+                    "validator": response.headers.get("ETag") or response.headers.get("Last-Modified"),
+                    "total": response.content_length,
+                    "digests": expected_digests(response.headers),
+                    "segments": None,
+                }
+                if self._use_segments(response, state):
+                    state["segments"] = self._plan_segments(state["total"])
+                    self._save_state(state_path, state)
+                    with open(part_path, "wb") as f:
+                        f.truncate(state["total"])
+                    response.release()
+                    return await self._fetch_segments(session, url, part_path, state_path, state)
+                self._save_state(state_path, state)
+                mode = "wb"
+
+            with open(part_path, mode) as f:
+                f.write(first_chunk)
+                async for chunk in response.content.iter_chunked(self.chunk_size):
+                    f.write(chunk)
+        return state
+
+    async def _check_pdf(self, response):
+        """
+        Check the Content-Type and magic bytes of a full response and return the bytes read.
+        """
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type and content_type not in PDF_CONTENT_TYPES:
+            raise NeedsBrowser(f"served {content_type}")
+
+        first_chunk = await response.content.read(1024)
+        if PDF_MAGIC not in first_chunk:
+            if b"<html" in first_chunk.lower() or b"<!doctype" in first_chunk.lower():
+                raise NeedsBrowser("served an HTML page")
+            raise ValueError("response is not a PDF (missing %PDF- header)")
+        return first_chunk
+
+    def _use_segments(self, response, state):
+        return (
+            self.segments > 1
+            and state["total"] is not None
+            and state["total"] >= self.segment_threshold
+            and state["validator"] is not None
+            and response.headers.get("Accept-Ranges", "").lower() == "bytes"
+        )
+
+    def _plan_segments(self, total):
+        """
+        Split `total` bytes into `segments` ranges of `[start, end, bytes_done]`.
+        """
+        size = -(-total // self.segments)
+        return [[start, min(start + size, total) - 1, 0] for start in range(0, total, size)]
+
+    async def _fetch_segments(self, session, url, part_path, state_path, state):
+        """
+        Fetch the unfinished byte ranges of a large file in parallel, writing each at its offset.
+
+        Progress of every range is saved to the state file when the ranges
+        stop, so a retry or a later run only fetches what is still missing.
+        """
+
+        async def fetch_segment(segment):
+            start, end, done = segment
+            if start + done > end:
+                return
+            headers = {"Range": f"bytes={start + done}-{end}", "If-Range": state["validator"]}
+            response = await polite_get(session, self.scheduler, url, self.max_retries, headers=headers)
+            if response is None:
+                raise PermissionError("Disallowed by robots.txt")
+            async with response:
+                if response.status != 206:
+                    self._discard(part_path, state_path)
+                    raise ValueError(f"server answered {response.status} to a range request; the file may have changed")
+                with open(part_path, "r+b") as f:
+                    f.seek(start + done)
+                    async for chunk in response.content.iter_chunked(self.chunk_size):
+                        f.write(chunk)
+                        segment[2] += len(chunk)
+
+        results = await asyncio.gather(*(fetch_segment(segment) for segment in state["segments"]),
+                                       return_exceptions=True)
+        if os.path.exists(part_path):
+            self._save_state(state_path, state)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return state
+
+    def _finish(self, url, part_path, state_path, state):
+        """
+        Verify a completed partial file and move it into place.
+
+        The size must match the announced length, the file must start with the
+        PDF magic bytes, and the checksum must match any digest the server sent.
+        """
+        size = os.path.getsize(part_path)
+        total = state.get("total")
+        if total is not None and size != total:
+            if size > total:
+                self._discard(part_path, state_path)
+            raise ValueError(f"size mismatch: got {size} bytes, expected {total}")
+
+        with open(part_path, "rb") as f:
+            if not f.read(1024).startswith(PDF_MAGIC):
+                self._discard(part_path, state_path)
+                raise ValueError("downloaded file is not a PDF (missing %PDF- header)")
+
+        sha256 = sha256_file(part_path)
+        for algorithm, expected in (state.get("digests") or {}).items():
+            actual = sha256 if algorithm == "sha256" else file_digest(part_path, algorithm)
+            if actual != expected:
+                self._discard(part_path, state_path)
+                raise ValueError(f"{algorithm} checksum mismatch")
+
+        filename = state["filename"]
+        path = self._unique_path(filename)
+        os.replace(part_path, path)
+        self._discard(state_path)
+
+        if self.store is not None:
+            sha256, stored = self.store.add_file(path, url, filename, sha256=sha256)
+            if not stored:
+                self._log(f"{url} is a copy of an already stored PDF")
+            path = self.store.path_for(sha256)
+        return path
+
+    async def download_all(self, links, update_progress=None, total=None, frontier=None):
+        """
+        Download links concurrently.
+
+        `links` may be any iterable, such as a frontier's claims; it is read
+        a bounded number of links ahead into per-host queues, so it is never
+        loaded into memory as a whole and a busy host does not hold up the
+        others. If a `Frontier` is given, downloaded and failed links are
+        recorded in it; links that need a browser are left for the caller.
+        Returns a mapping of link to saved path, and the list of links that
+        need a browser.
+        """
+        downloaded = {}
+        needs_browser = []
+        if total is None:
+            links = list(links)
+            total = len(links)
+        completed = 0
+
+        async def download(url):
+            nonlocal completed
+            try:
+                downloaded[url] = await self._download(session, url)
+                self._log(f"Downloaded {url} -> {os.path.basename(downloaded[url])}")
+                if frontier:
+                    frontier.mark_fetched(url, self.STAGE)
+            except NeedsBrowser as e:
+                needs_browser.append(url)
+                self._log(f"{url} {e}; falling back to the browser")
+            except Exception as e:
+                self.logger.error(f"Failed to download PDF from {url}: {e}")
+                if frontier:
+                    frontier.mark_failed(url, self.STAGE, e)
+            completed += 1
+            if update_progress:
+                update_progress(completed, max(total, completed), f"Downloading {completed}/{total} PDFs...")
+
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.max_per_host, ssl=False)
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout, sock_connect=30)
+        # Sizes and Range offsets refer to the bytes on the wire, so bodies must not be content-encoded
+        headers = {"User-Agent": self.user_agent, "Accept-Encoding": "identity"}
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers,
+                                         auto_decompress=False) as session:
+            try:
+                await run_per_host(links, download, self.max_concurrency, self.max_per_host)
+            finally:
+                await self.scheduler.close()
+        return downloaded, needs_browser
+
+    def run(self, links, update_progress=None, total=None, frontier=None):
+        """
+        Blocking entry point around `download_all`.
+        """
+        return asyncio.run(self.download_all(links, update_progress, total, frontier))
@@ -1,75 +1,67 @@
 import os
-import csv
-import time
 import logging
-from selenium import webdriver
+from core.scrapers.politeness import BROWSER_USER_AGENT, PolitenessScheduler
+from core.scrapers.browser_pool import get_browser_pool
+from core.scrapers.pdf_downloader import PdfDownloader
+from core.scrapers.download_watcher import DownloadWatcher
+from core.scrapers.pdf_store import PdfStore
+from core.scrapers.frontier import Frontier, frontier_path
 
 
 def setup_webdriver(output_folder):
     """
-    Set up the WebDriver with the specified download directory.
+    Lease a browser from the shared pool that downloads into the specified directory.
     """
-    output_folder = os.path.abspath(output_folder)
-    os.makedirs(output_folder, exist_ok=True)
-
-    options = webdriver.ChromeOptions()
-    prefs = {
-        "download.default_directory": output_folder,
-        "download.prompt_for_download": False,
-        "download.directory_upgrade": True,
-        "plugins.always_open_pdf_externally": True,
-        "safebrowsing.enabled": True,
-        "profile.default_content_setting_values.automatic_downloads": 1,
-    }
-    options.add_experimental_option("prefs", prefs)
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
+    return get_browser_pool().acquire(download_dir=output_folder)
 
-    return webdriver.Chrome(options=options)
 
-
-def wait_for_download(path, max_wait_time=300):
-    """
-    Wait for all downloads to complete in the specified directory.
-    """
-    start_time = time.time()
-    while True:
-        downloading = any(file.endswith(".crdownload") for file in os.listdir(path))
-        if not downloading:
-            break
-        if time.time() - start_time > max_wait_time:
-            logging.warning("Download timeout occurred.")
-            break
-        time.sleep(2)
-
-
-def scrape_from_list(link_list, output_folder, update_progress=None):
+def scrape_from_list(link_list, output_folder, update_progress=None, scheduler=None, start_timeout=10, max_wait_time=300):
     """
     Visit each link in the list and trigger downloads.
+
+    Returns a mapping of link to `(filename, seconds)` for the completed downloads.
     """
-    driver = setup_webdriver(output_folder)
+    scheduler = scheduler or PolitenessScheduler(user_agent=BROWSER_USER_AGENT)
     os.makedirs(output_folder, exist_ok=True)
+    driver = setup_webdriver(output_folder)
+    watcher = DownloadWatcher(output_folder).start()
 
     total_links = len(link_list)
-    for idx, link in enumerate(link_list):
-        try:
-            driver.get(link)
-            logging.info(f"{idx + 1}/{total_links} - Downloading PDF from {link}")
-
-            time.sleep(2)  # Allow time for download to start
-
-            # Update progress
-            if update_progress:
-                update_progress(idx + 1, total_links, f"Downloading {idx + 1}/{total_links} PDFs...")
-        except Exception as e:
-            logging.error(f"Failed to download PDF from {link}: {e}")
-
-    wait_for_download(output_folder)
-    driver.quit()
-
-def pdf_scraper_main(csv_path, project_folder, update_progress=None, log_callback=None):
+    try:
+        for idx, link in enumerate(link_list):
+            try:
+                if not scheduler.acquire_sync(link):
+                    logging.warning(f"Skipping {link}: disallowed by robots.txt")
+                    continue
+                download = watcher.expect(link)
+                driver.get(link)
+                logging.info(f"{idx + 1}/{total_links} - Downloading PDF from {link}")
+
+                if not watcher.wait_started(download, start_timeout):
+                    logging.warning(f"No download started for {link} within {start_timeout}s")
+
+                # Update progress
+                if update_progress:
+                    update_progress(idx + 1, total_links, f"Downloading {idx + 1}/{total_links} PDFs...")
+            except Exception as e:
+                logging.error(f"Failed to download PDF from {link}: {e}")
+
+        for download in watcher.wait_all(max_wait_time):
+            logging.warning(f"Download timeout occurred for {download.link}")
+    finally:
+        watcher.stop()
+        get_browser_pool().release(driver)
+
+    results = watcher.results()
+    for link, (filename, seconds) in results.items():
+        logging.info(f"{link} -> {filename} in {seconds}s")
+    return results
+
+def pdf_scraper_main(csv_path, project_folder, update_progress=None, log_callback=None, max_concurrency=8, resume=True):
     """
     Main function to scrape PDFs from links in a CSV file.
+
+    Links are fetched over HTTP, or in the browser when that fails; with `resume` a rerun skips finished links.
     """
     # Configure log file
     logs_folder = os.path.join(project_folder, "pdfs", "logs")
@@ -90,32 +82,55 @@ def pdf_scraper_main(csv_path, project_folder, update_progress=None, log_callbac
     # Log startup message
     logger.info("PDF Scraper started.")
 
-    # Configure output folder for PDFs
-    pdf_output_folder = os.path.join(project_folder, "pdfs", "scraped-pdfs")
-    os.makedirs(pdf_output_folder, exist_ok=True)
+    # Configure the PDF store and the folder downloads are staged in
+    store = PdfStore(os.path.join(project_folder, "pdfs", "scraped-pdfs"))
+    incoming_folder = os.path.join(project_folder, "pdfs", "incoming")
+    os.makedirs(incoming_folder, exist_ok=True)
 
-    # Read links from the CSV file
+    # Queue links from the CSV file in the frontier
+    frontier = Frontier(frontier_path(project_folder))
     try:
-        with open(csv_path, "r") as f:
-            reader = csv.reader(f)
-            next(reader)  # Skip header row
-            link_list = [row[0] for row in reader]
+        frontier.add_from_csv(csv_path, source=os.path.basename(csv_path))
+        if not resume:
+            frontier.reset(PdfDownloader.STAGE)
+        frontier.release_claims(PdfDownloader.STAGE)
+        total_links = frontier.enqueue(PdfDownloader.STAGE)
     except Exception as e:
         logger.error(f"Failed to read CSV file: {e}")
+        frontier.close()
         raise
 
     # Log total links
-    logger.info(f"Total links to process: {len(link_list)}")
+    logger.info(f"Total links to process: {total_links}")
 
     # Scrape PDFs
+    scheduler = PolitenessScheduler(user_agent=BROWSER_USER_AGENT)
     try:
-        scrape_from_list(link_list=link_list, output_folder=pdf_output_folder, update_progress=update_progress)
+        downloader = PdfDownloader(incoming_folder, max_concurrency=max_concurrency, scheduler=scheduler, store=store)
+        downloaded, needs_browser = downloader.run(
+            frontier.iter_claims(PdfDownloader.STAGE, batch_size=max_concurrency * 4),
+            update_progress=update_progress, total=total_links, frontier=frontier,
+        )
+        logger.info(f"Downloaded {len(downloaded)} PDFs directly, {len(needs_browser)} need the browser")
+        if needs_browser:
+            browser_downloads = scrape_from_list(link_list=needs_browser, output_folder=incoming_folder,
+                                                 update_progress=update_progress, scheduler=scheduler)
+            for link in needs_browser:
+                if link in browser_downloads:
+                    filename = browser_downloads[link][0]
+                    store.add_file(os.path.join(incoming_folder, filename), link, filename)
+                    frontier.mark_fetched(link, PdfDownloader.STAGE)
+                else:
+                    frontier.mark_failed(link, PdfDownloader.STAGE, "No download completed in the browser")
+        logger.info(f"Frontier: {frontier.summary(PdfDownloader.STAGE)}")
     except Exception as e:
         logger.error(f"Error during PDF scraping: {e}")
         raise
+    finally:
+        frontier.close()
 
     # Log completion message
-    logger.info("PDF Scraper completed.")
+    logger.info(f"PDF Scraper completed. {len(store.documents())} unique PDFs in the store.")
     if log_callback:
         log_callback("PDF download completed.")
 
@@ -0,0 +1,122 @@
+import os
+import re
+import csv
+import hashlib
+import threading
+from datetime import datetime, timezone
+
+MANIFEST_FIELDS = ["sha256", "source_url", "size", "fetched_at", "original_filename"]
+HASHED_NAME = re.compile(r"^[0-9a-f]{64}\.pdf$")
+
+
+def sha256_file(path, chunk_size=1024 * 1024):
+    """
+    Return the hex SHA-256 of a file, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PdfStore:
+    def __init__(self, store_folder, manifest_path=None):
+        """
+        Initialize a content-addressed store of PDFs in `store_folder`.
+
+        Every document is kept once as `<sha256>.pdf`. The manifest (by default
+        `manifest.csv` next to the store folder) records where each copy came
+        from and is the single source of truth for what the store holds: a
+        document fetched again from another URL only adds a manifest row.
+        PDFs left in the folder under their original names by earlier runs are
+        adopted into the store on first use.
+        """
+        self.store_folder = store_folder
+        self.manifest_path = manifest_path or os.path.join(os.path.dirname(os.path.abspath(store_folder)), "manifest.csv")
+        self._lock = threading.Lock()
+        os.makedirs(self.store_folder, exist_ok=True)
+
+        self._entries = self._read_manifest()
+        self._hashes = {entry["sha256"] for entry in self._entries}
+        self._adopt_loose_files()
+
+    def _read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return []
+        with open(self.manifest_path, "r", newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+
+    def _append_manifest(self, entry):
+        new_file = not os.path.exists(self.manifest_path)
+        with open(self.manifest_path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=MANIFEST_FIELDS)
+            if new_file:
+                writer.writeheader()
+            writer.writerow(entry)
+        self._entries.append(entry)
+
+    def _adopt_loose_files(self):
+        """
+        Move PDFs that are not named by their hash yet into the store.
+        """
+        for name in sorted(os.listdir(self.store_folder)):
+            if name.lower().endswith(".pdf") and not HASHED_NAME.match(name):
+                self.add_file(os.path.join(self.store_folder, name), source_url="", original_filename=name)
+
+    def path_for(self, sha256):
+        """
+        Return the path a document with the given hash is stored at.
+        """
+        return os.path.join(self.store_folder, f"{sha256}.pdf")
+
+    def add_file(self, path, source_url, original_filename=None, sha256=None):
+        """
+        Move a downloaded file into the store and record it in the manifest.
+
+        If the same content is already stored, the file is discarded and only
+        a manifest row for the new source is added (none if the source is
+        already recorded). Returns `(sha256, stored)`, where `stored` tells
+        whether new content was written.
+        """
+        sha256 = sha256 or sha256_file(path)
+        size = os.path.getsize(path)
+        with self._lock:
+            stored = sha256 not in self._hashes
+            if stored:
+                os.replace(path, self.path_for(sha256))
+                self._hashes.add(sha256)
+            else:
+                os.remove(path)
+
+            if stored or not any(e["sha256"] == sha256 and e["source_url"] == source_url for e in self._entries):
+                self._append_manifest({
+                    "sha256": sha256,
+                    "source_url": source_url,
+                    "size": size,
+                    "fetched_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "original_filename": original_filename or os.path.basename(path),
+                })
+        return sha256, stored
+
+    def entries(self):
+        """
+        Return every manifest row, one per (document, source URL) pair.
+        """
+        with self._lock:
+            return list(self._entries)
+
+    def documents(self):
+        """
+        Return one manifest row per stored document, in the order they were first stored.
+
+        Rows whose file has gone missing from the store are skipped.
+        """
+        seen = set()
+        documents = []
+        for entry in self.entries():
+            if entry["sha256"] in seen or not os.path.exists(self.path_for(entry["sha256"])):
+                continue
+            seen.add(entry["sha256"])
+            documents.append(entry)
+        return documents
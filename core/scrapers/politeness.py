@@ -0,0 +1,252 @@
+import time
+import asyncio
+import threading
+import urllib.request
+import urllib.error
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+
+BACKOFF_STATUSES = (429, 503)
+# Sent by the direct HTTP fetchers, so servers see the same agent as from the browser path
+BROWSER_USER_AGENT = ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) "
+                      "HeadlessChrome/131.0.0.0 Safari/537.36")
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header (delta seconds or HTTP date) into seconds, or None.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+async def polite_get(session, scheduler, url, max_retries=3, **kwargs):
+    """
+    GET a URL through a politeness scheduler, retrying on 429/503.
+
+    Returns the response (to be used as an async context manager), or None
+    if robots.txt disallows the URL.
+    """
+    for attempt in range(max_retries + 1):
+        if not await scheduler.acquire(url):
+            return None
+        response = await session.get(url, **kwargs)
+        scheduler.report(url, response.status, response.headers.get("Retry-After"))
+        if response.status not in BACKOFF_STATUSES or attempt == max_retries:
+            return response
+        response.release()
+
+
+class _HostState:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.max_rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.backoff = 0.0
+
+
+class PolitenessScheduler:
+    def __init__(self, rate=2.0, burst=4, min_rate=0.05, base_backoff=5.0, max_backoff=300.0,
+                 user_agent="*", respect_robots=True, robots_ttl=3600, log_callback=None):
+        """
+        Initialize a per-host request scheduler.
+
+        Each host gets a token bucket refilled at `rate` requests per second
+        (up to `burst`). A 429/503 halves the host's rate and blocks it for an
+        exponentially growing backoff, or for as long as Retry-After asks;
+        successful responses slowly restore the rate. robots.txt is fetched
+        once per host and cached for `robots_ttl` seconds, and its
+        Crawl-delay lowers the host's rate.
+
+        The bucket state is guarded by a thread lock, so one scheduler can be
+        shared by async fetchers (`acquire`) and blocking callers such as
+        Selenium loops (`acquire_sync`).
+        """
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.user_agent = user_agent
+        self.respect_robots = respect_robots
+        self.robots_ttl = robots_ttl
+        self.log_callback = log_callback or (lambda msg: None)
+
+        self._lock = threading.Lock()
+        self._hosts = {}
+        self._robots = {}
+        self._robots_tasks = {}
+        self._session = None
+
+    @staticmethod
+    def _origin(url):
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _host_state(self, origin):
+        state = self._hosts.get(origin)
+        if state is None:
+            state = self._hosts[origin] = _HostState(self.rate, self.burst)
+        return state
+
+    def _reserve(self, url):
+        """
+        Take a token for the URL's host and return how long the caller must wait before sending.
+        """
+        with self._lock:
+            state = self._host_state(self._origin(url))
+            now = time.monotonic()
+            state.tokens = min(state.burst, state.tokens + (now - state.updated) * state.rate)
+            state.updated = now
+            state.tokens -= 1
+            delay = -state.tokens / state.rate if state.tokens < 0 else 0.0
+            return max(delay, state.blocked_until - now)
+
+    def report(self, url, status, retry_after=None):
+        """
+        Feed a response status back into the host's rate and backoff.
+        """
+        with self._lock:
+            state = self._host_state(self._origin(url))
+            if status in BACKOFF_STATUSES:
+                state.backoff = min(self.max_backoff, max(self.base_backoff, state.backoff * 2))
+                wait = parse_retry_after(retry_after)
+                wait = min(self.max_backoff, wait) if wait is not None else state.backoff
+                state.blocked_until = max(state.blocked_until, time.monotonic() + wait)
+                state.rate = max(self.min_rate, state.rate / 2)
+                self.log_callback(f"{self._origin(url)} answered {status}, backing off {wait:.0f}s")
+            elif status < 400:
+                state.backoff = state.backoff / 2 if state.backoff > 1 else 0.0
+                state.rate = min(state.max_rate, state.rate + state.max_rate * 0.05)
+
+    def _apply_robots(self, origin, parser):
+        """
+        Cache a parsed robots.txt and apply its Crawl-delay to the host's rate.
+        """
+        with self._lock:
+            self._robots[origin] = (time.monotonic() + self.robots_ttl, parser)
+            delay = parser.crawl_delay(self.user_agent) if parser else None
+            if delay:
+                state = self._host_state(origin)
+                state.max_rate = min(state.max_rate, 1.0 / float(delay))
+                state.rate = min(state.rate, state.max_rate)
+                state.burst = 1
+                state.tokens = min(state.tokens, 1)
+
+    def _cached_robots(self, origin):
+        with self._lock:
+            cached = self._robots.get(origin)
+        if cached and cached[0] > time.monotonic():
+            return True, cached[1]
+        return False, None
+
+    @staticmethod
+    def _parse_robots(status, text):
+        """
+        Build a robots parser from a robots.txt response, following the usual status conventions.
+        """
+        parser = RobotFileParser()
+        if status in (401, 403):
+            parser.disallow_all = True
+        elif status >= 400:
+            parser.allow_all = True
+        else:
+            parser.parse(text.splitlines())
+        return parser
+
+    def _allowed(self, parser, url):
+        return parser is None or parser.can_fetch(self.user_agent, url)
+
+    async def _fetch_robots(self, origin):
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=15), headers={"User-Agent": self.user_agent}
+            )
+        try:
+            async with self._session.get(f"{origin}/robots.txt", ssl=False) as response:
+                parser = self._parse_robots(response.status, await response.text(errors="replace"))
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            parser = None  # Unreachable robots.txt does not block the crawl
+        self._apply_robots(origin, parser)
+        return parser
+
+    async def can_fetch(self, url):
+        """
+        Check robots.txt for a URL, fetching and caching it on first use of the host.
+        """
+        if not self.respect_robots:
+            return True
+        origin = self._origin(url)
+        found, parser = self._cached_robots(origin)
+        if not found:
+            task = self._robots_tasks.get(origin)
+            if task is None:
+                task = self._robots_tasks[origin] = asyncio.ensure_future(self._fetch_robots(origin))
+                task.add_done_callback(lambda _: self._robots_tasks.pop(origin, None))
+            parser = await asyncio.shield(task)
+        return self._allowed(parser, url)
+
+    async def acquire(self, url):
+        """
+        Wait until the URL's host may be contacted again.
+
+        Returns False without waiting if robots.txt disallows the URL.
+        """
+        if not await self.can_fetch(url):
+            return False
+        delay = self._reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return True
+
+    def can_fetch_sync(self, url):
+        """
+        Blocking variant of `can_fetch` for callers outside an event loop.
+        """
+        if not self.respect_robots:
+            return True
+        origin = self._origin(url)
+        found, parser = self._cached_robots(origin)
+        if not found:
+            request = urllib.request.Request(f"{origin}/robots.txt", headers={"User-Agent": self.user_agent})
+            try:
+                with urllib.request.urlopen(request, timeout=15) as response:
+                    parser = self._parse_robots(response.status, response.read().decode("utf-8", "replace"))
+            except urllib.error.HTTPError as e:
+                parser = self._parse_robots(e.code, "")
+            except (urllib.error.URLError, OSError):
+                parser = None
+            self._apply_robots(origin, parser)
+        return self._allowed(parser, url)
+
+    def acquire_sync(self, url):
+        """
+        Blocking variant of `acquire` for callers outside an event loop.
+        """
+        if not self.can_fetch_sync(url):
+            return False
+        delay = self._reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    async def close(self):
+        """
+        Close the session used for robots.txt requests.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,108 @@
+from core.scrapers.site_settings import site_key
+
+# URL extensions standing in for each resource type, since Network.setBlockedURLs matches URL patterns only
+RESOURCE_EXTENSIONS = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "stylesheet": ("css",),
+    "media": ("mp4", "webm", "ogg", "mp3", "wav", "m4a", "mov"),
+}
+
+# Stylesheets are left alone by default: scroll strategies rely on the page layout
+DEFAULT_BLOCKED_TYPES = ("image", "font", "media")
+
+DEFAULT_DENIED_DOMAINS = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "amazon-adsystem.com",
+    "facebook.net",
+    "hotjar.com",
+    "scorecardresearch.com",
+    "criteo.com",
+    "taboola.com",
+    "outbrain.com",
+)
+
+# Raises Chrome's default limit of 250 resource timing entries for documents loaded afterwards
+RESOURCE_TIMING_BUFFER_SCRIPT = "performance.setResourceTimingBufferSize(100000);"
+
+# Sums the bytes of the document and its subresources not counted yet, per the Resource Timing API
+TRANSFER_SIZE_SCRIPT = """
+const entries = performance.getEntriesByType("navigation").concat(performance.getEntriesByType("resource"));
+let bytes = 0;
+for (const entry of entries.slice(window.__countedEntries || 0)) bytes += entry.transferSize || 0;
+window.__countedEntries = entries.length;
+return bytes;
+"""
+
+
+def _in_domain(host, domain):
+    return host == domain or host.endswith("." + domain)
+
+
+class RequestBlockingPolicy:
+    def __init__(self, block_types=DEFAULT_BLOCKED_TYPES, deny_domains=DEFAULT_DENIED_DOMAINS, allow_domains=(),
+                 enabled=True):
+        """
+        Initialize a policy for the requests a browser should not make.
+
+        Resources of the `block_types` in `RESOURCE_EXTENSIONS` are blocked by
+        URL extension, and every request to `deny_domains` (or their
+        subdomains) is blocked. `allow_domains` take domains back off the deny
+        list, e.g. an analytics host a site cannot render without; Chrome's
+        URL blocking has no exceptions, so they do not exempt a domain from
+        the resource type blocks.
+        """
+        unknown = set(block_types) - set(RESOURCE_EXTENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown resource types: {', '.join(sorted(unknown))}")
+        self.block_types = tuple(block_types)
+        self.deny_domains = tuple(site_key(domain) for domain in deny_domains)
+        self.allow_domains = tuple(site_key(domain) for domain in allow_domains)
+        self.enabled = enabled
+
+    def for_site(self, site_settings, url):
+        """
+        Return the policy for a site, with its `request_blocking` override from the site settings applied.
+
+        The override is either `false`, to load the site unfiltered, or an
+        object whose `block_types` replace the policy's and whose
+        `deny_domains` and `allow_domains` are added to it.
+        """
+        override = site_settings.get(url, "request_blocking")
+        if override is None:
+            return self
+        if not isinstance(override, dict):
+            override = {"enabled": bool(override)}
+        return RequestBlockingPolicy(
+            block_types=override.get("block_types", self.block_types),
+            deny_domains=self.deny_domains + tuple(override.get("deny_domains", ())),
+            allow_domains=self.allow_domains + tuple(override.get("allow_domains", ())),
+            enabled=override.get("enabled", self.enabled),
+        )
+
+    def url_patterns(self):
+        """
+        The URL patterns to pass to `Network.setBlockedURLs`.
+        """
+        if not self.enabled:
+            return []
+        patterns = []
+        for resource_type in self.block_types:
+            for extension in RESOURCE_EXTENSIONS[resource_type]:
+                patterns.extend((f"*.{extension}", f"*.{extension}?*"))
+        for domain in dict.fromkeys(self.deny_domains):
+            if any(_in_domain(domain, allowed) for allowed in self.allow_domains):
+                continue
+            patterns.extend((f"*://{domain}/*", f"*://*.{domain}/*"))
+        return patterns
+
+    def apply(self, driver):
+        """
+        Apply the policy to the driver's current tab through the Chrome DevTools Protocol.
+        """
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.url_patterns()})
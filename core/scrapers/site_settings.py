@@ -0,0 +1,52 @@
+import os
+import json
+import threading
+from urllib.parse import urlsplit
+
+
+def site_key(url_or_host):
+    """
+    Normalise a URL or host name to the key sites are stored under, e.g. `example.com`.
+    """
+    host = urlsplit(url_or_host).hostname if "//" in url_or_host else url_or_host.split("/")[0]
+    host = (host or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class SiteSettings:
+    def __init__(self, path):
+        """
+        Initialize per-site scraping settings stored as JSON at `path`.
+
+        Settings are keyed by site (host without `www.`), e.g.
+        `{"example.com": {"requires_js": true}}`. They are written back
+        whenever a value changes, so what one run learns about a site is
+        used by the next.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._settings = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._settings = json.load(f)
+
+    def get(self, site, key, default=None):
+        """
+        Return a setting for a site (URL or host), or `default` if it is not set.
+        """
+        with self._lock:
+            return self._settings.get(site_key(site), {}).get(key, default)
+
+    def set(self, site, key, value):
+        """
+        Store a setting for a site (URL or host) and save the file.
+        """
+        with self._lock:
+            site_settings = self._settings.setdefault(site_key(site), {})
+            if site_settings.get(key) == value:
+                return
+            site_settings[key] = value
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(self._settings, f, indent=2, sort_keys=True)
+            os.replace(self.path + ".tmp", self.path)
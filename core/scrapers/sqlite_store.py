@@ -0,0 +1,45 @@
+import os
+import sqlite3
+import threading
+
+
+class SqliteStore:
+    def __init__(self, db_path, commit_interval=200):
+        """
+        Open a SQLite database in WAL mode, shared between threads.
+
+        Writes made through `_execute` are committed in batches of
+        `commit_interval`; every statement should run under `_lock`.
+        """
+        self.db_path = db_path
+        self.commit_interval = commit_interval
+        self._uncommitted = 0
+        self._lock = threading.RLock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+    def _execute(self, sql, params):
+        with self._lock:
+            self.conn.execute(sql, params)
+            self._uncommitted += 1
+            if self._uncommitted >= self.commit_interval:
+                self.commit()
+
+    def commit(self):
+        """
+        Make all recorded changes durable.
+        """
+        with self._lock:
+            self.conn.commit()
+            self._uncommitted = 0
+
+    def close(self):
+        """
+        Commit outstanding changes and close the database.
+        """
+        with self._lock:
+            self.commit()
+            self.conn.close()
@@ -0,0 +1,135 @@
+import re
+import asyncio
+import logging
+from urllib.parse import urlsplit, urldefrag
+
+import aiohttp
+import lxml.html
+from lxml.cssselect import CSSSelector
+from core.scrapers.politeness import BROWSER_USER_AGENT, PolitenessScheduler, polite_get
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+# lxml refuses decoded text that still declares an encoding
+XML_DECLARATION = re.compile(r"^\s*<\?xml[^>]*\?>")
+# Statuses meaning the page does not exist, e.g. a page number past the end of pagination
+MISSING_STATUSES = (404, 410)
+# Second-level labels under which a country code TLD registers domains, e.g. `co.uk` or `go.id`
+SECOND_LEVEL_LABELS = {"ac", "co", "com", "edu", "go", "gov", "mil", "net", "or", "org", "sch", "web"}
+
+
+def base_domain(url):
+    """
+    Return the registrable domain of a URL, e.g. `example.co.uk` for `https://news.example.co.uk/a`.
+    """
+    host = (urlsplit(url).hostname or "").rstrip(".")
+    labels = host.split(".")
+    if labels[-1].isdigit() or ":" in host:
+        return host  # An IP address
+    if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_LABELS:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def extract_links(html, base_url, selector, internal_only=True):
+    """
+    Return the links matched by a CSS selector in an HTML document, made absolute against `base_url`.
+
+    Anchors matched by the selector contribute their own `href`; any other
+    matched element contributes the anchors inside it. With `internal_only`,
+    links outside the page's registrable domain are dropped, as crawl4ai's
+    internal links are, so subdomains of the same site are kept.
+    """
+    if isinstance(html, str):
+        html = XML_DECLARATION.sub("", html, count=1)
+    if not html or not html.strip():
+        return set()
+    try:
+        document = lxml.html.fromstring(html, base_url=base_url)
+    except lxml.etree.ParserError:
+        return set()  # Nothing but comments or whitespace
+    document.make_links_absolute(base_url, resolve_base_href=True, handle_failures="ignore")
+
+    links = set()
+    site = base_domain(base_url)
+    for element in CSSSelector(selector)(document):
+        anchors = [element] if element.tag == "a" else element.iterfind(".//a")
+        for anchor in anchors:
+            href = anchor.get("href")
+            if not href or not href.startswith(("http://", "https://")):
+                continue
+            href = urldefrag(href)[0]
+            if internal_only and base_domain(href) != site:
+                continue
+            links.add(href)
+    return links
+
+
+class StaticLinkExtractor:
+    def __init__(self, max_concurrency=8, max_per_host=4, request_timeout=30, max_retries=2, scheduler=None,
+                 user_agent=BROWSER_USER_AGENT, log_callback=None):
+        """
+        Initialize a browserless link extractor for server-rendered listing pages.
+
+        Pages are fetched over aiohttp (at most `max_concurrency` at once and
+        `max_per_host` per site, paced by the politeness scheduler) and the
+        link selector is applied with lxml, so no browser is started.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.request_timeout = request_timeout
+        self.max_retries = max_retries
+        self.scheduler = scheduler or PolitenessScheduler(user_agent=user_agent)
+        self.user_agent = user_agent
+        self.log_callback = log_callback or (lambda msg: None)
+
+    async def _fetch(self, session, url, selector):
+        response = await polite_get(session, self.scheduler, url, self.max_retries)
+        if response is None:
+            raise PermissionError("Disallowed by robots.txt")
+        async with response:
+            if response.status in MISSING_STATUSES:
+                return set()
+            response.raise_for_status()
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if content_type and content_type not in HTML_CONTENT_TYPES:
+                raise ValueError(f"served {content_type}")
+            html = await response.read()
+        return extract_links(html, str(response.url), selector)
+
+    async def extract_all(self, pages):
+        """
+        Fetch `(url, selector)` pages concurrently and return a mapping of page URL to the links found.
+
+        A page maps to an empty set when the selector matched nothing or the
+        page does not exist (404/410), and to None when it could not be
+        fetched; both are candidates for a browser.
+        """
+        results = {}
+        host_limits = {}
+        global_limit = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(session, url, selector):
+            host_limit = host_limits.setdefault(urlsplit(url).netloc, asyncio.Semaphore(self.max_per_host))
+            # Wait for the host first, so a busy host's queued pages do not hold global slots
+            async with host_limit, global_limit:
+                try:
+                    results[url] = await self._fetch(session, url, selector)
+                except Exception as e:
+                    logging.info(f"Static fetch of {url} failed: {e}")
+                    results[url] = None
+
+        headers = {"User-Agent": self.user_agent}
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.max_per_host, ssl=False)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+            try:
+                await asyncio.gather(*(fetch(session, url, selector) for url, selector in pages))
+            finally:
+                await self.scheduler.close()
+        return results
+
+    def run(self, pages):
+        """
+        Blocking entry point around `extract_all`.
+        """
+        return asyncio.run(self.extract_all(pages))
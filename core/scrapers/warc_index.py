@@ -0,0 +1,184 @@
+import os
+import io
+import json
+import heapq
+import mmap
+from urllib.parse import urlsplit, parse_qsl, urlencode
+from warcio.archiveiterator import ArchiveIterator
+
+INDEXED_RECORD_TYPES = ("response", "revisit")
+
+
+def surt_key(url):
+    """
+    Build a sortable SURT-style key for a URL, e.g. `com,example)/news?id=1`.
+
+    The scheme and a leading `www.` are dropped, the host is reversed, the
+    query arguments are sorted and the key is lowercased, so trivially
+    different spellings of the same URL share a key.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    host_key = ",".join(reversed(host.split(".")))
+    if parts.port and parts.port not in (80, 443):
+        host_key += f":{parts.port}"
+
+    path = parts.path or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    if query:
+        path += f"?{query}"
+    return f"{host_key}){path}".lower()
+
+
+def _cdx_timestamp(warc_date):
+    """
+    Convert a WARC-Date such as `2025-01-02T03:04:05Z` into a 14-digit CDX timestamp.
+    """
+    return "".join(ch for ch in warc_date if ch.isdigit())[:14]
+
+
+class WarcIndex:
+    def __init__(self, index_path, warc_folder):
+        """
+        Initialize a CDXJ index for the WARC segments in `warc_folder`.
+
+        The index at `index_path` is kept sorted by URL key and timestamp so
+        lookups can binary-search it. Entries written during a crawl go to an
+        unsorted `<index>.pending` file first and are merged in by `merge_pending`.
+        """
+        self.index_path = index_path
+        self.pending_path = index_path + ".pending"
+        self.warc_folder = warc_folder
+        self._pending_file = None
+
+    def add(self, record, filename, offset, length):
+        """
+        Append a CDXJ entry for a record that was written at `offset` in `filename`.
+        """
+        if record.rec_type not in INDEXED_RECORD_TYPES:
+            return
+
+        url = record.rec_headers.get_header("WARC-Target-URI")
+        fields = {
+            "url": url,
+            "digest": record.rec_headers.get_header("WARC-Payload-Digest"),
+            "length": str(length),
+            "offset": str(offset),
+            "filename": filename,
+        }
+        if record.http_headers:
+            fields["mime"] = (record.http_headers.get_header("Content-Type") or "").split(";")[0].strip()
+            fields["status"] = record.http_headers.get_statuscode()
+        if record.rec_type == "revisit":
+            fields["mime"] = "warc/revisit"
+
+        timestamp = _cdx_timestamp(record.rec_headers.get_header("WARC-Date"))
+        line = f"{surt_key(url)} {timestamp} {json.dumps(fields, sort_keys=True)}\n"
+
+        if self._pending_file is None:
+            self._pending_file = open(self.pending_path, "a", encoding="utf-8")
+        self._pending_file.write(line)
+        self._pending_file.flush()
+
+    def merge_pending(self):
+        """
+        Merge pending entries into the sorted index and remove the pending file.
+        """
+        if self._pending_file is not None:
+            self._pending_file.close()
+            self._pending_file = None
+        if not os.path.exists(self.pending_path):
+            return
+
+        with open(self.pending_path, "r", encoding="utf-8") as f:
+            pending = sorted(line if line.endswith("\n") else line + "\n" for line in f if line.strip())
+
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as out:
+            if os.path.exists(self.index_path):
+                with open(self.index_path, "r", encoding="utf-8") as existing:
+                    out.writelines(heapq.merge(existing, pending))
+            else:
+                out.writelines(pending)
+        os.replace(temp_path, self.index_path)
+        os.remove(self.pending_path)
+
+    def lookup(self, url):
+        """
+        Return all index entries for a URL, oldest capture first.
+
+        The sorted index is memory-mapped and binary-searched, so the cost is
+        O(log n) in the number of indexed captures. Entries still in the
+        pending file (from a crawl that has not finished) are included as well.
+        """
+        prefix = (surt_key(url) + " ").encode("utf-8")
+        lines = []
+
+        if os.path.exists(self.index_path) and os.path.getsize(self.index_path) > 0:
+            with open(self.index_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                position = self._bisect(mm, prefix)
+                while position < len(mm):
+                    end = mm.find(b"\n", position)
+                    end = len(mm) if end == -1 else end
+                    line = mm[position:end]
+                    if not line.startswith(prefix):
+                        break
+                    lines.append(line)
+                    position = end + 1
+
+        if os.path.exists(self.pending_path):
+            with open(self.pending_path, "rb") as f:
+                lines.extend(line.rstrip(b"\n") for line in f if line.startswith(prefix))
+
+        entries = []
+        for line in sorted(lines):
+            _, timestamp, fields = line.decode("utf-8").split(" ", 2)
+            entry = json.loads(fields)
+            entry["timestamp"] = timestamp
+            entries.append(entry)
+        return entries
+
+    @staticmethod
+    def _bisect(mm, key):
+        """
+        Return the offset of the first line in the sorted mapping that is >= `key`.
+        """
+        lo, hi = 0, len(mm)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = mm.rfind(b"\n", 0, mid) + 1
+            end = mm.find(b"\n", start)
+            end = len(mm) if end == -1 else end
+            if mm[start:end] < key:
+                lo = end + 1
+            else:
+                hi = start
+        return lo
+
+    def read_record(self, entry):
+        """
+        Load the WARC record an index entry points at, without scanning the segment.
+        """
+        warc_path = os.path.join(self.warc_folder, entry["filename"])
+        if not os.path.exists(warc_path):
+            warc_path += ".open"  # Segment is still being written
+        offset = int(entry["offset"])
+        length = int(entry["length"])
+        with open(warc_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = mm[offset:offset + length]
+        return next(iter(ArchiveIterator(io.BytesIO(data))))
+
+    def get_latest(self, url):
+        """
+        Load the most recent capture of a URL, or None if it was never indexed.
+        """
+        entries = self.lookup(url)
+        return self.read_record(entries[-1]) if entries else None
+
+    def close(self):
+        """
+        Merge anything written during this session into the sorted index.
+        """
+        self.merge_pending()
@@ -1,33 +1,60 @@
 import os
-import csv
-import socket
-from io import BytesIO
-from warcio.warcwriter import WARCWriter
-from warcio.statusandheaders import StatusAndHeaders
 import logging
-from warcio.warcwriter import WARCWriter
-from warcio.statusandheaders import StatusAndHeaders
-from io import BytesIO
-import aiohttp
-import socket
-import os
 import asyncio
 import uuid
+import base64
+import hashlib
+import tempfile
+from io import BytesIO
 from datetime import datetime
-import csv
-import time
+from urllib.parse import urlsplit
+
+import aiohttp
+from warcio.statusandheaders import StatusAndHeaders
+from core.scrapers.dns_resolver import CachingResolver
+from core.scrapers.warc_writer import RollingWarcWriter, BackgroundWarcWriter
+from core.scrapers.warc_index import WarcIndex
+from core.scrapers.crawl_journal import CrawlJournal
+from core.scrapers.frontier import Frontier, frontier_path
+from core.scrapers.politeness import BROWSER_USER_AGENT, PolitenessScheduler, polite_get
+from core.scrapers.host_queue import run_per_host
 
 class WarcScraper:
-    def __init__(self, project_folder, log_callback=None):
+    REVISIT_NOT_MODIFIED = "http://netpreserve.org/warc/1.0/revisit/server-not-modified"
+    REVISIT_IDENTICAL_DIGEST = "http://netpreserve.org/warc/1.0/revisit/identical-payload-digest"
+    STAGE = "warc"
+    REQUEST_HEADERS = {
+        "User-Agent": BROWSER_USER_AGENT,
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    }
+
+    def __init__(self, project_folder, log_callback=None, max_concurrency=32, max_per_host=4, request_timeout=120,
+                 dns_ttl=300, chunk_size=64 * 1024, spool_threshold=1024 * 1024, max_segment_size=1024 ** 3,
+                 host_rate=2.0, max_retries=3, respect_robots=True, writer_queue_size=256):
         """
         Initialize the WARC scraper with project folder setup and logging.
+
+        Concurrency is capped globally by `max_concurrency` and per site by `max_per_host`.
         """
         self.project_folder = project_folder
         self.log_callback = log_callback or (lambda msg: None)
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.request_timeout = request_timeout
+        self.dns_ttl = dns_ttl
+        self.chunk_size = chunk_size
+        self.spool_threshold = spool_threshold
+        self.max_segment_size = max_segment_size
+        self.host_rate = host_rate
+        self.max_retries = max_retries
+        self.respect_robots = respect_robots
+        self.writer_queue_size = writer_queue_size
 
         # Directories for output
         self.logs_folder = os.path.join(self.project_folder, "warcs", "logs")
         self.warcs_folder = os.path.join(self.project_folder, "warcs", "scraped-warcs")
+        self.index_path = os.path.join(self.project_folder, "warcs", "index.cdxj")
+        self.journal_path = os.path.join(self.project_folder, "warcs", "crawl_journal.sqlite3")
 
         os.makedirs(self.logs_folder, exist_ok=True)
         os.makedirs(self.warcs_folder, exist_ok=True)
@@ -51,91 +78,297 @@ class WarcScraper:
         self.logger.info(message)
         self.log_callback(message)
 
-    def scrape_csv(self, csv_path, update_progress=None):
+    def scrape_csv(self, csv_path, update_progress=None, resume=True):
         """
-        Scrape URLs from a CSV file and save them as WARC files.
+        Scrape URLs from a CSV file and save them to WARC segments.
+
+        URLs are claimed from the subproject's frontier; with `resume`, ones already saved are skipped.
         """
+        frontier = Frontier(frontier_path(self.project_folder))
+        journal = CrawlJournal(self.journal_path)
         try:
-            with open(csv_path, "r") as f:
-                reader = csv.reader(f)
-                next(reader)  # Skip the header
-                link_list = [row[0] for row in reader]
-            self._log(f"Starting scraping for CSV: {csv_path}")
-            # self.scrape_from_list(link_list, update_progress)
-            asyncio.run(self.crawl_and_save_to_warc(link_list,self.warcs_folder,update_progress))
-            self._log(f"Completed scraping for CSV: {csv_path}")
+            frontier.add_from_csv(csv_path, source=os.path.basename(csv_path))
+            if not resume:
+                frontier.reset(self.STAGE)
+            frontier.release_claims(self.STAGE)
+            total_links = frontier.enqueue(self.STAGE)
+            fetched = frontier.count(self.STAGE, Frontier.FETCHED)
+            if fetched:
+                self._log(f"Resuming: skipping {fetched} URLs already saved")
+            self._log(f"Starting scraping for CSV: {csv_path} ({total_links} links)")
+            asyncio.run(self.crawl_and_save_to_warc(
+                frontier.iter_claims(self.STAGE, batch_size=self.max_concurrency * 4), self.warcs_folder,
+                update_progress, total_links=total_links, journal=journal, frontier=frontier,
+            ))
+            self._log(f"Completed scraping for CSV: {csv_path} ({frontier.summary(self.STAGE)})")
 
         except Exception as e:
             self._log(f"Error processing CSV {csv_path}: {e}")
+        finally:
+            journal.close()
+            frontier.close()
+
+    def _create_connector(self, resolver):
+        """
+        Create a keep-alive connection pool sized to the concurrency limits.
 
+        DNS caching is handled by the shared resolver, so the connector's own cache is disabled.
+        """
+        return aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.max_per_host,
+            resolver=resolver,
+            use_dns_cache=False,
+            keepalive_timeout=30,
+            enable_cleanup_closed=True,
+            ssl=False,
+        )
 
-    async def crawl_and_save_to_warc(self,links, warc_folder,update_progress=None):
+    async def crawl_and_save_to_warc(self, links, warc_folder, update_progress=None, total_links=None, journal=None,
+                                     frontier=None):
         """
-        Crawl a list of links using crawl4ai and save the content as WARC files.
+        Crawl a list of links concurrently and append the captures to rolling WARC segments.
+
+        Captures are recorded in the `CrawlJournal` and outcomes in the `Frontier` when given.
         """
         # Ensure the folder exists
         os.makedirs(warc_folder, exist_ok=True)
-        total_links=len(links)
-        async with aiohttp.ClientSession() as session:
-            for idx,url in enumerate(links,start=1):
-                try:
-                    # Asynchronous GET request
-                    async with session.get(url, ssl=False) as response:
-                        response_text = await response.text()
-                        ip_address = socket.gethostbyname(url.split("/")[2])
-
-                        # Sanitize the URL for file naming
-                        sanitized_url = url.removesuffix("/").split("/")[-1].replace(".html", "").replace("/", "_").replace(":", "_")
-                        warc_file_path = os.path.join(warc_folder, f"{sanitized_url}.warc")
-
-                        with open(warc_file_path, "wb") as f:
-                            writer = WARCWriter(filebuf=f, gzip=False)
-
-                            # Request record
-                            request_headers = [
-                                ("Host", url.split("/")[2]),
-                                ("User-Agent", "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) HeadlessChrome/131.0.0.0 Safari/537.36"),
-                                ("Accept", "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8"),
-                            ]
-                            request_status_line = "GET / HTTP/1.1"
-                            http_request_headers = StatusAndHeaders(request_status_line, request_headers, is_http_request=True)
-                            request_payload = BytesIO()
-                            request_record = writer.create_warc_record(url, "request", payload=request_payload, http_headers=http_request_headers)
-                            request_record.rec_headers.add_header("WARC-IP-Address", ip_address)
-                            writer.write_record(request_record)
-
-                            # Response record
-                            response_status_line = f"HTTP/1.1 {response.status} OK"
-                            response_headers = [
-                                ("Content-Type", response.headers.get("Content-Type")),
-                                ("Server", response.headers.get("Server", "Unknown")),
-                            ]
-                            http_response_headers = StatusAndHeaders(response_status_line, response_headers)
-                            response_payload = BytesIO(response_text.encode("utf-8"))
-                            response_record = writer.create_warc_record(url, "response", payload=response_payload, http_headers=http_response_headers)
-                            response_record.rec_headers.add_header("WARC-Concurrent-To", request_record.rec_headers.get_header("WARC-Record-ID"))
-                            response_record.rec_headers.add_header("WARC-IP-Address", ip_address)
-                            writer.write_record(response_record)
-
-                            # Metadata record
-                            timestamp = datetime.now().isoformat() + "Z"
-                            metadata_content = f"URL: {url}\nTimestamp: {timestamp}\nContent-Length: {len(response_text.encode('utf-8'))}\n"
-                            metadata_payload = BytesIO(metadata_content.encode("utf-8"))
-                            metadata_record = writer.create_warc_record(
-                                f"urn:uuid:{str(uuid.uuid4())}",
-                                "metadata",
-                                payload=metadata_payload,
-                                warc_content_type="application/warc-fields",
-                            )
-                            metadata_record.rec_headers.add_header("WARC-Concurrent-To", response_record.rec_headers.get_header("WARC-Record-ID"))
-                            metadata_record.rec_headers.add_header("WARC-IP-Address", ip_address)
-                            writer.write_record(metadata_record)
-                        if update_progress:
-                            update_progress(idx, total_links, f"Processed {idx}/{total_links}: {url}")
-
-
-                        print(f"Saved WARC file for {url} at {warc_file_path}")
-                except Exception as e:
-                    print(f"Failed to fetch {url}: {e}")
+        if total_links is None:
+            links = list(links)
+            total_links = len(links)
+
+        self._run_stats = {"saved": 0, "not_modified": 0, "unchanged": 0, "duplicate": 0}
+        completed = 0
+
+        async def fetch(url):
+            nonlocal completed
+            await self._fetch_and_save(session, resolver, scheduler, writer, url, journal, frontier)
+            completed += 1
+            if update_progress:
+                update_progress(
+                    completed, total_links,
+                    f"Processed {completed}/{total_links}: {url} (writer queue {writer.depth}/{writer.max_queue})",
+                )
+
+        resolver = CachingResolver(ttl=self.dns_ttl)
+        scheduler = PolitenessScheduler(
+            rate=self.host_rate, user_agent=self.REQUEST_HEADERS["User-Agent"],
+            respect_robots=self.respect_robots, log_callback=self._log,
+        )
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+        # Bodies are archived as sent, so leave Content-Encoding undecoded
+        async with aiohttp.ClientSession(
+            connector=self._create_connector(resolver),
+            timeout=timeout,
+            headers=self.REQUEST_HEADERS,
+            auto_decompress=False,
+        ) as session:
+            index = WarcIndex(self.index_path, warc_folder)
+            rolling_writer = RollingWarcWriter(warc_folder, max_segment_size=self.max_segment_size,
+                                               log_callback=self.logger.info, index=index)
+            writer = BackgroundWarcWriter(rolling_writer, max_queue=self.writer_queue_size,
+                                          log_callback=self.logger.error).start()
+            try:
+                await run_per_host(links, fetch, self.max_concurrency, self.max_per_host)
+            finally:
+                await scheduler.close()
+                await writer.close()
+        self._log(writer.summary())
+        self._log(f"DNS: {resolver.lookups} lookups, {resolver.hits} cache hits")
+        self._log(
+            f"Saved {self._run_stats['saved']} full captures, "
+            f"{self._run_stats['not_modified']} not modified, {self._run_stats['unchanged']} unchanged, "
+            f"{self._run_stats['duplicate']} duplicates of other URLs"
+        )
+
+    async def _fetch_and_save(self, session, resolver, scheduler, writer, url, journal=None, frontier=None):
+        """
+        Fetch a single URL and hand its records to the background WARC writer.
+
+        Unchanged or duplicate bodies are stored as `revisit` records pointing at the earlier capture.
+        """
+        previous = journal.get_capture(url) if journal else None
+        request_headers = {}
+        if previous and previous["etag"]:
+            request_headers["If-None-Match"] = previous["etag"]
+        if previous and previous["last_modified"]:
+            request_headers["If-Modified-Since"] = previous["last_modified"]
+
+        body = None
+        try:
+            # Asynchronous GET request
+            response = await polite_get(session, scheduler, url, self.max_retries, headers=request_headers)
+            if response is None:
+                raise PermissionError("Disallowed by robots.txt")
+            async with response:
+                ip_address = await resolver.ip_address(urlsplit(url).hostname)
+                http_request_headers = self._request_headers(response)
+                http_response_headers = self._response_headers(response)
+                status = response.status
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+
+                if previous and status == 304:
+                    original = previous
+                    outcome = "not_modified"
+                else:
+                    body = tempfile.SpooledTemporaryFile(max_size=self.spool_threshold)
+                    payload_digester = hashlib.sha1()
+                    async for chunk in response.content.iter_chunked(self.chunk_size):
+                        payload_digester.update(chunk)
+                        body.write(chunk)
+                    body_length = body.tell()
+                    body.seek(0)
+                    payload_digest = "sha1:" + base64.b32encode(payload_digester.digest()).decode("ascii")
+
+                    original = None
+                    if previous and payload_digest == previous["payload_digest"]:
+                        original = previous
+                        outcome = "unchanged"
+                        body.close()
+                        body = None
+                    else:
+                        # Whether another URL already stored this payload is settled on the writer thread
+                        outcome = "saved"
+        except Exception as e:
+            if body:
+                body.close()
+            if frontier:
+                frontier.mark_failed(url, self.STAGE, e)
+            print(f"Failed to fetch {url}: {e}")
+            return
+
+        def write_job(warc_writer):
+            # Runs on the writer thread; the URL only counts as done once its records are on disk.
+            # Jobs run one at a time, so a payload recorded here is seen by the next job's lookup.
+            nonlocal outcome, original
+            try:
+                if outcome == "saved" and journal and status == 200:
+                    original = journal.find_payload(payload_digest)
+                    if original:
+                        outcome = "duplicate"
+                if outcome == "saved":
+                    warc_file_path, response_record = self._write_warc(
+                        warc_writer,
+                        url,
+                        http_request_headers,
+                        http_response_headers,
+                        body,
+                        body_length,
+                        payload_digest,
+                        ip_address,
+                    )
+                    if journal and status == 200:
+                        record_id = response_record.rec_headers.get_header("WARC-Record-ID")
+                        warc_date = response_record.rec_headers.get_header("WARC-Date")
+                        journal.record_capture(url, etag, last_modified, payload_digest, record_id, warc_date)
+                        journal.record_payload(payload_digest, url, record_id, warc_date)
+                else:
+                    profile = self.REVISIT_NOT_MODIFIED if outcome == "not_modified" else self.REVISIT_IDENTICAL_DIGEST
+                    warc_file_path = self._write_revisit(
+                        warc_writer, url, http_request_headers, http_response_headers, original, profile, ip_address,
+                    )
+                    if outcome == "duplicate":
+                        # Remember the original as this URL's capture, so recrawls can revisit it too
+                        journal.record_capture(
+                            url, etag, last_modified, payload_digest, original["record_id"], original["warc_date"]
+                        )
+                    else:
+                        journal.update_validators(url, etag, last_modified)
+                self._run_stats[outcome] += 1
+                if frontier:
+                    frontier.mark_fetched(url, self.STAGE)
+                print(f"Saved WARC records for {url} to {warc_file_path}")
+            except Exception as e:
+                if frontier:
+                    frontier.mark_failed(url, self.STAGE, e)
+                print(f"Failed to write {url}: {e}")
+            finally:
+                if body:
+                    body.close()
+
+        await writer.submit(write_job)
+
+    def _request_headers(self, response):
+        """
+        Build the HTTP request line and headers that were actually sent for a response.
+        """
+        request_info = response.request_info
+        request_url = request_info.url
+        request_headers = list(request_info.headers.items())
+        if "Host" not in request_info.headers:
+            request_headers.insert(0, ("Host", request_url.raw_authority))
+        request_status_line = f"{request_info.method} {request_url.raw_path_qs} HTTP/1.1"
+        return StatusAndHeaders(request_status_line, request_headers, is_http_request=True)
+
+    def _response_headers(self, response):
+        """
+        Build the HTTP status line and headers as received, minus Transfer-Encoding (aiohttp removes the chunking).
+        """
+        protocol = f"HTTP/{response.version.major}.{response.version.minor}"
+        response_status_line = f"{response.status} {response.reason or ''}".rstrip()
+        response_headers = [
+            (name.decode("latin-1"), value.decode("latin-1"))
+            for name, value in response.raw_headers
+            if name.lower() != b"transfer-encoding"
+        ]
+        return StatusAndHeaders(response_status_line, response_headers, protocol=protocol)
+
+    def _write_warc(self, writer, url, http_request_headers, http_response_headers, body, body_length, payload_digest,
+                    ip_address):
+        """
+        Append the WARC records for one fetched URL to the rolling writer.
+
+        Returns the segment path and the response record.
+        """
+        # Request record
+        request_payload = BytesIO()
+        request_record = writer.create_warc_record(url, "request", payload=request_payload, http_headers=http_request_headers)
+        request_record.rec_headers.add_header("WARC-IP-Address", ip_address)
+
+        # Response record
+        response_record = writer.create_warc_record(
+            url,
+            "response",
+            payload=body,
+            length=body_length,
+            warc_headers_dict={"WARC-Payload-Digest": payload_digest},
+            http_headers=http_response_headers,
+        )
+        response_record.rec_headers.add_header("WARC-Concurrent-To", request_record.rec_headers.get_header("WARC-Record-ID"))
+        response_record.rec_headers.add_header("WARC-IP-Address", ip_address)
+
+        # Metadata record
+        timestamp = datetime.now().isoformat() + "Z"
+        metadata_content = f"URL: {url}\nTimestamp: {timestamp}\nContent-Length: {body_length}\n"
+        metadata_payload = BytesIO(metadata_content.encode("utf-8"))
+        metadata_record = writer.create_warc_record(
+            f"urn:uuid:{str(uuid.uuid4())}",
+            "metadata",
+            payload=metadata_payload,
+            warc_content_type="application/warc-fields",
+        )
+        metadata_record.rec_headers.add_header("WARC-Concurrent-To", response_record.rec_headers.get_header("WARC-Record-ID"))
+        metadata_record.rec_headers.add_header("WARC-IP-Address", ip_address)
+
+        warc_file_path = writer.write_capture([request_record, response_record, metadata_record], expected_size=body_length)
+        return warc_file_path, response_record
+
+    def _write_revisit(self, writer, url, http_request_headers, http_response_headers, original, profile, ip_address):
+        """
+        Append a request and a `revisit` record pointing at an earlier capture, possibly of another URL.
+        """
+        # Request record
+        request_record = writer.create_warc_record(url, "request", payload=BytesIO(), http_headers=http_request_headers)
+        request_record.rec_headers.add_header("WARC-IP-Address", ip_address)
 
+        # Revisit record
+        revisit_record = writer.create_revisit_record(
+            url, original["payload_digest"], original["url"], original["warc_date"], http_headers=http_response_headers
+        )
+        revisit_record.rec_headers.replace_header("WARC-Profile", profile)
+        revisit_record.rec_headers.add_header("WARC-Refers-To", original["record_id"])
+        revisit_record.rec_headers.add_header("WARC-Concurrent-To", request_record.rec_headers.get_header("WARC-Record-ID"))
+        revisit_record.rec_headers.add_header("WARC-IP-Address", ip_address)
 
+        return writer.write_capture([request_record, revisit_record])
@@ -0,0 +1,214 @@
+import os
+import re
+import queue
+import asyncio
+import threading
+from warcio.warcwriter import WARCWriter
+
+SEGMENT_PATTERN = re.compile(r"^(?P<prefix>.+)-(?P<serial>\d{5})\.warc(?:\.open)?$")
+
+
+def list_warc_files(warc_folder):
+    """
+    List finished WARC files in a folder in a stable order.
+
+    Segments that are still being written carry a `.warc.open` suffix and are skipped.
+    """
+    if not os.path.exists(warc_folder):
+        return []
+    return sorted(f for f in os.listdir(warc_folder) if f.endswith(".warc"))
+
+
+class RollingWarcWriter:
+    def __init__(self, warc_folder, prefix="segment", max_segment_size=1024 ** 3, log_callback=None, index=None):
+        """
+        Initialize a writer that appends WARC records to size-capped segment files.
+
+        Segments are named `<prefix>-<serial>.warc` with a zero-padded serial that
+        continues from the highest one already in the folder. The segment being
+        written is kept as `<name>.warc.open` and renamed once it is finished.
+        If a `WarcIndex` is given, every record is indexed as it is written.
+        """
+        self.warc_folder = warc_folder
+        self.prefix = prefix
+        self.max_segment_size = max_segment_size
+        self.log_callback = log_callback or (lambda msg: None)
+        self.index = index
+        os.makedirs(self.warc_folder, exist_ok=True)
+
+        # Records are built through a detached writer, so they can be created off the segment file
+        self._builder = WARCWriter(filebuf=None, gzip=False)
+        self._file = None
+        self._writer = None
+        self._path = None
+        self._serial = self._recover_segments()
+
+    def _recover_segments(self):
+        """
+        Finish segments left open by an interrupted run and return the next serial number.
+        """
+        last_serial = -1
+        for name in os.listdir(self.warc_folder):
+            match = SEGMENT_PATTERN.match(name)
+            if not match or match.group("prefix") != self.prefix:
+                continue
+            last_serial = max(last_serial, int(match.group("serial")))
+            if name.endswith(".open"):
+                path = os.path.join(self.warc_folder, name)
+                os.replace(path, path[: -len(".open")])
+                self.log_callback(f"Recovered unfinished WARC segment {name}")
+        return last_serial + 1
+
+    @property
+    def current_path(self):
+        """
+        Final path of the segment currently being written, if any.
+        """
+        return self._path
+
+    def create_warc_record(self, *args, **kwargs):
+        """
+        Create a WARC record; takes the same arguments as `WARCWriter.create_warc_record`.
+        """
+        return self._builder.create_warc_record(*args, **kwargs)
+
+    def create_revisit_record(self, *args, **kwargs):
+        """
+        Create a revisit record; takes the same arguments as `WARCWriter.create_revisit_record`.
+        """
+        return self._builder.create_revisit_record(*args, **kwargs)
+
+    def _open_segment(self):
+        """
+        Start a new segment file and write its warcinfo record.
+        """
+        filename = f"{self.prefix}-{self._serial:05d}.warc"
+        self._serial += 1
+        self._path = os.path.join(self.warc_folder, filename)
+        self._file = open(self._path + ".open", "wb")
+        self._writer = WARCWriter(filebuf=self._file, gzip=False)
+        self._writer.write_record(self._writer.create_warcinfo_record(filename, {
+            "software": "ez-scrape",
+            "format": "WARC File Format 1.0",
+        }))
+
+    def _close_segment(self):
+        """
+        Finish the current segment and give it its final name.
+        """
+        if self._file is None:
+            return
+        self._file.close()
+        os.replace(self._path + ".open", self._path)
+        self.log_callback(f"Finished WARC segment {os.path.basename(self._path)}")
+        self._file = None
+        self._writer = None
+
+    def write_capture(self, records, expected_size=0):
+        """
+        Append the records of one capture to the current segment and return its path.
+
+        All records of a capture land in the same segment. A new segment is started
+        first when the capture (by `expected_size`) would push the current one past
+        `max_segment_size`.
+        """
+        if self._file is not None and self._file.tell() > 0 and self._file.tell() + expected_size > self.max_segment_size:
+            self._close_segment()
+        if self._file is None:
+            self._open_segment()
+
+        filename = os.path.basename(self._path)
+        for record in records:
+            offset = self._file.tell()
+            self._writer.write_record(record)
+            if self.index is not None:
+                self.index.add(record, filename, offset, self._file.tell() - offset)
+        self._file.flush()
+        return self._path
+
+    def close(self):
+        """
+        Finish the segment currently being written and merge its index entries.
+        """
+        self._close_segment()
+        if self.index is not None:
+            self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class BackgroundWarcWriter:
+    def __init__(self, writer, max_queue=256, log_callback=None):
+        """
+        Initialize a dedicated writer thread in front of a `RollingWarcWriter`.
+
+        Fetchers hand over write jobs (callables taking the rolling writer)
+        through a bounded queue and go back to the network right away; all
+        disk I/O happens on the writer thread. When the queue is full the
+        submitting coroutine waits off the event loop, and the wait is counted
+        in `stalls`, which shows the crawl is disk-bound.
+        """
+        self.writer = writer
+        self.max_queue = max_queue
+        self.log_callback = log_callback or (lambda msg: None)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="warc-writer", daemon=True)
+        self.peak_depth = 0
+        self.stalls = 0
+        self.written = 0
+
+    @property
+    def depth(self):
+        """
+        Number of write jobs waiting for the writer thread.
+        """
+        return self._queue.qsize()
+
+    def start(self):
+        """
+        Start the writer thread.
+        """
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            try:
+                job(self.writer)
+                self.written += 1
+            except Exception as e:
+                self.log_callback(f"WARC writer job failed: {e}")
+        self.writer.close()
+
+    async def submit(self, job):
+        """
+        Queue a write job, waiting off the event loop only if the queue is full.
+        """
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self.stalls += 1
+            await asyncio.get_running_loop().run_in_executor(None, self._queue.put, job)
+        self.peak_depth = max(self.peak_depth, self._queue.qsize())
+
+    async def close(self):
+        """
+        Drain the queue, close the rolling writer and stop the thread.
+        """
+        await asyncio.get_running_loop().run_in_executor(None, self._queue.put, None)
+        await asyncio.get_running_loop().run_in_executor(None, self._thread.join)
+
+    def summary(self):
+        """
+        Describe queue pressure, to tell whether network or disk is the bottleneck.
+        """
+        bottleneck = "disk" if self.stalls else "network"
+        return (f"WARC writer: {self.written} captures written, peak queue {self.peak_depth}/{self.max_queue}, "
+                f"{self.stalls} stalled hand-offs (bottleneck: {bottleneck})")
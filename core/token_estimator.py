@@ -7,6 +7,8 @@ from bs4 import BeautifulSoup
 from langdetect import detect
 from warcio.archiveiterator import ArchiveIterator
 import fitz  # PyMuPDF for PDF handling
+from core.scrapers.warc_writer import list_warc_files
+from core.scrapers.pdf_store import PdfStore
 
 class TokenEstimator:
     def __init__(self, project_folder, log_callback=None):
@@ -22,6 +24,7 @@ class TokenEstimator:
 
         os.makedirs(self.logs_folder, exist_ok=True)
         os.makedirs(self.tokens_folder, exist_ok=True)
+        self.revisits_skipped = 0
 
         # Configure logger
         self.logger = logging.getLogger("TokenEstimator")
@@ -75,6 +78,45 @@ class TokenEstimator:
         soup = BeautifulSoup(html_content, "html.parser")
         return soup.get_text(separator=" ")
 
+    def count_tokens_in_warc_records(self, warc_path, use_css_selector=False, css_selector=None):
+        """
+        Count tokens per response record in a WARC file.
+
+        Yields `(target_uri, token_count)` for every response record, so a
+        segment holding many captures can be reported URL by URL. Revisit
+        records (unchanged pages and duplicates of other URLs) carry no body
+        of their own and are skipped, so the same content is counted once.
+        """
+        if use_css_selector and not css_selector:
+            raise ValueError("CSS selector must be provided for tag-based extraction.")
+
+        with open(warc_path, "rb") as stream:
+            for record in ArchiveIterator(stream):
+                if record.rec_type == "revisit":
+                    self.revisits_skipped += 1
+                if record.rec_type != "response":
+                    continue
+
+                target_uri = record.rec_headers.get_header("WARC-Target-URI")
+                record_tokens = 0
+                try:
+                    html_content = record.content_stream().read()
+                    if use_css_selector:
+                        soup = BeautifulSoup(html_content, "html.parser")
+                        target_elements = soup.select(css_selector)
+                        for element in target_elements:
+                            text = element.get_text(separator=" ", strip=True)
+                            record_tokens += self.count_tokens_in_text(text)
+                    else:
+                        text_content = self.extract_text_from_html(html_content)
+                        language = detect(text_content) if text_content.strip() else "unknown"
+                        if language == "id":
+                            record_tokens += self.count_tokens_in_text(text_content)
+                except Exception as e:
+                    self._log(f"Error processing record {target_uri} in {warc_path}: {e}")
+
+                yield target_uri, record_tokens
+
     def count_tokens_in_single_warc(self, warc_path, use_css_selector=False, css_selector=None):
         """
         Count tokens in a single WARC file.
@@ -83,25 +125,9 @@ class TokenEstimator:
         records_count = 0
 
         try:
-            with open(warc_path, "rb") as stream:
-                for record in ArchiveIterator(stream):
-                    if record.rec_type == "response":
-                        html_content = record.content_stream().read()
-                        if use_css_selector:
-                            if not css_selector:
-                                raise ValueError("CSS selector must be provided for tag-based extraction.")
-                            soup = BeautifulSoup(html_content, "html.parser")
-                            target_elements = soup.select(css_selector)
-                            for element in target_elements:
-                                text = element.get_text(separator=" ", strip=True)
-                                total_tokens += self.count_tokens_in_text(text)
-                        else:
-                            text_content = self.extract_text_from_html(html_content)
-                            language = detect(text_content) if text_content.strip() else "unknown"
-                            if language == "id":
-                                total_tokens += self.count_tokens_in_text(text_content)
-
-                        records_count += 1
+            for _, record_tokens in self.count_tokens_in_warc_records(warc_path, use_css_selector, css_selector):
+                total_tokens += record_tokens
+                records_count += 1
 
             self._log(f"Processed {records_count} records from {warc_path}: {total_tokens} tokens")
             return total_tokens
@@ -112,27 +138,32 @@ class TokenEstimator:
     def process_pdfs(self, pdf_folder, update_progress=None):
         """
         Process PDFs and count tokens.
+
+        The documents to count are read from the PDF store's manifest, so each
+        distinct document is counted once however many URLs served it.
         """
-        pdf_files = [f for f in os.listdir(pdf_folder) if f.endswith(".pdf")]
+        store = PdfStore(pdf_folder)
+        documents = store.documents()
         csv_path = os.path.join(self.tokens_folder, "tokens.csv") 
 
-        self._log(f"Found {len(pdf_files)} PDF files in {pdf_folder}")
+        self._log(f"Found {len(documents)} PDF files in {store.manifest_path}")
 
         total_tokens = 0
 
         with open(csv_path, "w", newline="") as csv_file:
             csv_writer = csv.writer(csv_file)
-            csv_writer.writerow(["file", "token_count"])
+            csv_writer.writerow(["file", "token_count", "url"])
 
-            for idx, pdf_file in enumerate(tqdm(pdf_files, desc="Processing PDFs", leave=True), start=1):
-                pdf_path = os.path.join(pdf_folder, pdf_file)
+            for idx, document in enumerate(tqdm(documents, desc="Processing PDFs", leave=True), start=1):
+                pdf_path = store.path_for(document["sha256"])
+                pdf_file = os.path.basename(pdf_path)
                 try:
                     _, token_count = self.count_tokens_in_pdf(pdf_path)
-                    csv_writer.writerow([pdf_file, token_count])
+                    csv_writer.writerow([pdf_file, token_count, document["source_url"]])
                     total_tokens += token_count
 
                     if update_progress:
-                        update_progress(idx, len(pdf_files), f"Processed {idx}/{len(pdf_files)} PDFs")
+                        update_progress(idx, len(documents), f"Processed {idx}/{len(documents)} PDFs")
                 except Exception as e:
                     self._log(f"Failed to process PDF {pdf_file}: {e}")
 
@@ -143,30 +174,37 @@ class TokenEstimator:
 
     def process_warcs(self, warc_folder, use_css_selector=False, css_selector=None, update_progress=None):
         """
-        Process WARC files and count tokens.
+        Process WARC segments and count tokens.
 
         If a CSS selector is provided, it extracts text based on the selector.
-        Otherwise, processes all text in the HTML.
+        Otherwise, processes all text in the HTML. One row is written per
+        captured URL, tagged with the segment it was read from.
         """
-        warc_files = [f for f in os.listdir(warc_folder) if f.endswith(".warc")]
+        warc_files = list_warc_files(warc_folder)
         csv_path = os.path.join(self.tokens_folder, "tokens.csv")
 
         self._log(f"Found {len(warc_files)} WARC files in {warc_folder}")
 
         total_tokens = 0
+        self.revisits_skipped = 0
 
         with open(csv_path, "a", newline="") as csv_file:
             csv_writer = csv.writer(csv_file)
-            csv_writer.writerow(["file", "token_count"])
+            csv_writer.writerow(["file", "token_count", "url"])
 
             for idx, warc_file in enumerate(tqdm(warc_files, desc="Processing WARCs"), start=1):
                 warc_file_path = os.path.join(warc_folder, warc_file)
                 try:
-                    file_token_count = self.count_tokens_in_single_warc(
+                    file_token_count = 0
+                    records_count = 0
+                    for target_uri, record_tokens in self.count_tokens_in_warc_records(
                         warc_file_path, use_css_selector, css_selector
-                    )
-                    csv_writer.writerow([warc_file, file_token_count])
+                    ):
+                        csv_writer.writerow([warc_file, record_tokens, target_uri])
+                        file_token_count += record_tokens
+                        records_count += 1
                     total_tokens += file_token_count
+                    self._log(f"Processed {records_count} records from {warc_file_path}: {file_token_count} tokens")
 
                     if update_progress:
                         update_progress(idx, len(warc_files), f"Processed {idx}/{len(warc_files)} WARCs")
@@ -176,5 +214,5 @@ class TokenEstimator:
             # Write total tokens for WARCs
             csv_writer.writerow(["TOTAL (WARCs)", total_tokens])
 
-        self._log(f"Completed processing WARCs. Total tokens: {total_tokens}")
-
+        self._log(f"Completed processing WARCs. Total tokens: {total_tokens} "
+                  f"({self.revisits_skipped} revisit records skipped)")
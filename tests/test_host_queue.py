@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+from core.scrapers.host_queue import run_per_host
+
+
+def test_busy_host_does_not_hold_up_other_hosts():
+    links = [f"http://slow.example/{i}" for i in range(8)] + ["http://fast.example/0"]
+    started = {}
+
+    async def handle(url):
+        started[url] = time.monotonic()
+        await asyncio.sleep(0.05 if "slow" in url else 0)
+
+    async def main():
+        begin = time.monotonic()
+        await run_per_host(links, handle, max_concurrency=4, max_per_host=1)
+        return begin
+
+    begin = asyncio.run(main())
+
+    assert set(started) == set(links)
+    assert started["http://fast.example/0"] - begin < 0.04
+
+
+def test_per_host_and_global_limits_are_respected():
+    links = [f"http://host{i % 3}.example/{i}" for i in range(30)]
+    running, peak, peak_per_host = {}, [0], {}
+
+    async def handle(url):
+        host = url.split("/")[2]
+        running[host] = running.get(host, 0) + 1
+        peak[0] = max(peak[0], sum(running.values()))
+        peak_per_host[host] = max(peak_per_host.get(host, 0), running[host])
+        await asyncio.sleep(0.01)
+        running[host] -= 1
+
+    asyncio.run(run_per_host(iter(links), handle, max_concurrency=4, max_per_host=2, lookahead=5))
+
+    assert peak[0] <= 4
+    assert max(peak_per_host.values()) <= 2
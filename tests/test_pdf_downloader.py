@@ -0,0 +1,212 @@
+import os
+import re
+import base64
+import asyncio
+import gzip
+import hashlib
+from contextlib import asynccontextmanager
+
+from aiohttp import web
+
+from core.scrapers.pdf_downloader import PdfDownloader
+from core.scrapers.politeness import PolitenessScheduler
+
+CONTENT = b"%PDF-1.4\n" + os.urandom(200 * 1024)
+
+
+class PdfServer:
+    """
+    Serves one PDF with an ETag and byte ranges, and can cut a connection or change the file.
+    """
+
+    def __init__(self, content, etag='"v1"'):
+        self.content = content
+        self.etag = etag
+        self.drop_after = None  # Bytes to send before cutting the connection of the next response
+        self.repr_digest = None
+        self.gzip = False  # Compress full responses for clients that accept gzip
+        self.requests = []
+
+    async def handle(self, request):
+        self.requests.append(dict(request.headers))
+        headers = {
+            "ETag": self.etag,
+            "Accept-Ranges": "bytes",
+            "Content-Type": "application/pdf",
+            "Content-Disposition": 'attachment; filename="report.pdf"',
+        }
+        if self.repr_digest:
+            headers["Repr-Digest"] = self.repr_digest
+
+        total = len(self.content)
+        start, end, status = 0, total - 1, 200
+        range_header = request.headers.get("Range")
+        if range_header and request.headers.get("If-Range", self.etag) == self.etag:
+            match = re.match(r"bytes=(\d+)-(\d*)", range_header)
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else total - 1
+            if start >= total:
+                return web.Response(status=416, headers={"Content-Range": f"bytes */{total}"})
+            status = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+
+        body = self.content[start:end + 1]
+        if self.gzip and status == 200 and "gzip" in request.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        response = web.StreamResponse(status=status, headers=headers)
+        response.content_length = len(body)
+        await response.prepare(request)
+        if self.drop_after is not None:
+            await response.write(body[:self.drop_after])
+            self.drop_after = None
+            request.transport.close()
+            return response
+        await response.write(body)
+        await response.write_eof()
+        return response
+
+
+@asynccontextmanager
+async def serve(server):
+    app = web.Application()
+    app.router.add_get("/report.pdf", server.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    try:
+        host, port = runner.addresses[0][:2]
+        yield f"http://{host}:{port}/report.pdf"
+    finally:
+        await runner.cleanup()
+
+
+def make_downloader(folder, **kwargs):
+    scheduler = PolitenessScheduler(rate=1000, burst=100, respect_robots=False)
+    return PdfDownloader(str(folder), chunk_size=8 * 1024, scheduler=scheduler, **kwargs)
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def part_files(folder):
+    return [name for name in os.listdir(folder) if ".part" in name]
+
+
+def test_dropped_connection_is_resumed_with_range(tmp_path):
+    server = PdfServer(CONTENT)
+    server.drop_after = 50 * 1024
+
+    async def main():
+        async with serve(server) as url:
+            return url, await make_downloader(tmp_path).download_all([url])
+
+    url, (downloaded, needs_browser) = asyncio.run(main())
+
+    assert read(downloaded[url]) == CONTENT
+    assert needs_browser == []
+    assert len(server.requests) == 2
+    resumed = server.requests[1]
+    assert resumed["Range"].startswith("bytes=") and resumed["Range"] != "bytes=0-"
+    assert resumed["If-Range"] == '"v1"'
+    assert part_files(tmp_path) == []
+
+
+def test_changed_file_restarts_download(tmp_path):
+    server = PdfServer(CONTENT)
+    server.drop_after = 50 * 1024
+    new_content = b"%PDF-1.7\n" + os.urandom(120 * 1024)
+
+    async def main():
+        async with serve(server) as url:
+            first = await make_downloader(tmp_path, max_retries=0).download_all([url])
+            # The file changes on the server, so If-Range no longer matches and the reply is a full 200
+            server.content, server.etag = new_content, '"v2"'
+            return url, first, await make_downloader(tmp_path).download_all([url])
+
+    url, (first, _), (downloaded, _) = asyncio.run(main())
+
+    assert first == {}
+    assert server.requests[1]["If-Range"] == '"v1"'
+    assert read(downloaded[url]) == new_content
+    assert part_files(tmp_path) == []
+
+
+def test_large_file_is_fetched_in_segments(tmp_path):
+    server = PdfServer(CONTENT)
+
+    async def main():
+        async with serve(server) as url:
+            downloader = make_downloader(tmp_path, segments=4, segment_threshold=64 * 1024)
+            return url, await downloader.download_all([url])
+
+    url, (downloaded, _) = asyncio.run(main())
+
+    assert read(downloaded[url]) == CONTENT
+    ranges = sorted(request["Range"] for request in server.requests if "Range" in request)
+    assert len(ranges) == 4
+    assert all(request["If-Range"] == '"v1"' for request in server.requests if "Range" in request)
+
+
+def test_repr_digest_mismatch_is_rejected(tmp_path):
+    server = PdfServer(CONTENT)
+    server.repr_digest = "sha-256=:" + base64.b64encode(hashlib.sha256(b"something else").digest()).decode() + ":"
+
+    async def main():
+        async with serve(server) as url:
+            return url, await make_downloader(tmp_path).download_all([url])
+
+    url, (downloaded, needs_browser) = asyncio.run(main())
+
+    assert url not in downloaded
+    assert needs_browser == []
+    assert os.listdir(tmp_path) == []
+
+
+def test_matching_repr_digest_is_accepted(tmp_path):
+    server = PdfServer(CONTENT)
+    server.repr_digest = "sha-256=:" + base64.b64encode(hashlib.sha256(CONTENT).digest()).decode() + ":"
+
+    async def main():
+        async with serve(server) as url:
+            return url, await make_downloader(tmp_path).download_all([url])
+
+    url, (downloaded, _) = asyncio.run(main())
+
+    assert read(downloaded[url]) == CONTENT
+
+
+def test_leftover_part_file_is_resumed_by_a_new_run(tmp_path):
+    server = PdfServer(CONTENT)
+    server.drop_after = 80 * 1024
+
+    async def main():
+        async with serve(server) as url:
+            first = await make_downloader(tmp_path, max_retries=0).download_all([url])
+            leftovers = part_files(tmp_path)
+            return url, first, leftovers, await make_downloader(tmp_path).download_all([url])
+
+    url, (first, _), leftovers, (downloaded, _) = asyncio.run(main())
+
+    assert first == {}
+    assert len(leftovers) == 2  # The partial file and its state file
+    assert server.requests[1]["Range"] == f"bytes={80 * 1024}-"
+    assert read(downloaded[url]) == CONTENT
+    assert part_files(tmp_path) == []
+
+
+def test_body_is_requested_without_content_encoding(tmp_path):
+    server = PdfServer(CONTENT)
+    server.gzip = True
+
+    async def main():
+        async with serve(server) as url:
+            return url, await make_downloader(tmp_path).download_all([url])
+
+    url, (downloaded, _) = asyncio.run(main())
+
+    assert server.requests[0]["Accept-Encoding"] == "identity"
+    assert read(downloaded[url]) == CONTENT
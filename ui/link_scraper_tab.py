@@ -26,6 +26,14 @@ def link_scraper_tab(output_root):
         pagination_url_list = [url.strip() for url in pagination_urls.split(',') if url.strip()]
 
         st.write("List of Pagination URL Templates:", pagination_url_list)
+
+        js_sites = st.text_input(
+            "Sites That Need JavaScript (Optional)",
+            placeholder="example.com, example2.com",
+            help="Pages are fetched without a browser when possible. List sites whose links only appear "
+                 "after JavaScript runs to always use the browser for them."
+        )
+        js_site_list = [site.strip() for site in js_sites.split(',') if site.strip()]
         # max_pages = st.number_input("Maximum Pages to Scrape", min_value=1, max_value=99999, value=5)
     
     elif scraping_strategy == "Next Button":
@@ -63,11 +71,14 @@ def link_scraper_tab(output_root):
     default_memory = "90"
     if scraping_strategy == "Pagination" :
         max_pages = st.text_input(
-            "Enter Your Web Pages Limit (Separate By Commas)",
+            "Enter Your Web Pages Limit (Optional, Separate By Commas)",
             placeholder="3,4,5,6",
-            help="Enter Max Pages separated by commas."
+            help="Enter Max Pages separated by commas. Leave a limit empty to find the last page automatically."
         )
-        max_pages_list=[int(max_page) for max_page in max_pages.split(',') if max_pages.strip()]
+        max_pages_list = [int(max_page) if max_page.strip().isdigit() else None
+                          for max_page in max_pages.split(',')] if max_pages.strip() else []
+        # Templates without a limit are crawled until their last page
+        max_pages_list += [None] * (len(pagination_url_list) - len(max_pages_list))
 
         # Default values
 
@@ -99,6 +110,29 @@ def link_scraper_tab(output_root):
         max_session = int(max_session) if max_session.isdigit() else int(default_session)
         max_memory = float(max_memory) if max_memory.replace('.', '', 1).isdigit() else float(default_memory)
 
+    max_workers = 1
+    block_requests = False
+    blocked_domain_list = []
+    if scraping_strategy in ("Next Button", "Scroll/Load More"):
+        max_workers = st.number_input(
+            "Parallel Browser Sessions",
+            min_value=1,
+            max_value=16,
+            value=1,
+            help="Number of sites scraped at the same time, each in its own headless browser."
+        )
+        block_requests = st.checkbox(
+            "Block Images, Fonts and Ads",
+            value=True,
+            help="Browsers skip images, fonts, media and known ad and analytics domains, since only links are needed."
+        )
+        blocked_domains = st.text_input(
+            "Extra Blocked Domains (Optional)",
+            placeholder="ads.example.com, tracker.example.net",
+            disabled=not block_requests
+        )
+        blocked_domain_list = [domain.strip() for domain in blocked_domains.split(',') if domain.strip()]
+
 
 
 
@@ -136,7 +170,11 @@ def link_scraper_tab(output_root):
                     multiple_links=True,
                     max_retries=max_memory if scraping_strategy == "Pagination" else int(default_retries) ,
                     max_session=max_session if scraping_strategy == "Pagination" else int(default_session),
-                    max_memory=max_memory if scraping_strategy == "Pagination" else int(default_memory)
+                    max_memory=max_memory if scraping_strategy == "Pagination" else int(default_memory),
+                    js_sites=js_site_list if scraping_strategy == "Pagination" else None,
+                    max_workers=int(max_workers),
+                    block_requests=block_requests,
+                    blocked_domains=blocked_domain_list
                 )
                 st.success("Link Scraping Completed!")
                 # Display Scraped Links
@@ -32,6 +32,9 @@ def pdf_scraper_tab(output_root):
         st.warning("`links.csv` not found in the current subproject.")
         return
 
+    resume = st.checkbox("Resume previous run", value=True,
+                         help="Skip links that were already downloaded and retry only failed or interrupted ones.")
+
     # Progress bar and logs
     progress_bar = st.empty()
     log_placeholder = st.empty()
@@ -46,7 +49,7 @@ def pdf_scraper_tab(output_root):
     if st.button("Start PDF Scraping"):
         with st.spinner("Scraping PDFs..."):
             try:
-                pdf_scraper_main(links_csv_path, subproject_folder, update_progress, log_callback)
+                pdf_scraper_main(links_csv_path, subproject_folder, update_progress, log_callback, resume=resume)
                 st.success("PDF scraping completed!")
                 st.write(f"PDFs saved to: `{pdf_output_folder}`")
             except Exception as e:
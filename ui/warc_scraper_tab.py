@@ -32,6 +32,19 @@ def warc_scraper_tab(output_root):
         st.warning("`links.csv` not found in the current subproject.")
         return
 
+    # Concurrency limits
+    max_concurrency = st.number_input("Max Concurrent Requests", min_value=1, max_value=512, value=32,
+                                      help="Maximum number of in-flight requests across all hosts.")
+    max_per_host = st.number_input("Max Concurrent Requests per Host", min_value=1, max_value=64, value=4,
+                                   help="Maximum number of in-flight requests against a single host.")
+    host_rate = st.number_input("Requests per Second per Host", min_value=0.1, max_value=100.0, value=2.0, step=0.5,
+                                help="Steady request rate per host. Lowered automatically by robots.txt Crawl-delay "
+                                     "and when a host answers 429/503.")
+
+    resume = st.checkbox("Resume previous run", value=True,
+                         help="Skip URLs already saved by an earlier run and retry only failed or interrupted ones. "
+                              "Uncheck to recrawl everything; unchanged pages are stored as revisit records.")
+
     # Progress bar
     progress_bar = st.empty()
     log_placeholder = st.empty()
@@ -46,11 +59,17 @@ def warc_scraper_tab(output_root):
 
     # Start scraping
     if st.button("Start WARC Scraping"):
-        scraper = WarcScraper(subproject_folder, log_callback=lambda msg: log_placeholder.text(msg))
+        scraper = WarcScraper(
+            subproject_folder,
+            log_callback=lambda msg: log_placeholder.text(msg),
+            max_concurrency=int(max_concurrency),
+            max_per_host=int(max_per_host),
+            host_rate=float(host_rate),
+        )
         with st.spinner("Scraping URLs..."):
             try:
                 start_time=time.time()
-                scraper.scrape_csv(links_csv_path, update_progress)
+                scraper.scrape_csv(links_csv_path, update_progress, resume=resume)
                 end_time=time.time()-start_time
                 elapsed_time(start_time,end_time)
                 st.success("WARC scraping completed!")